@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Arranque en frío y latencia por interacción del tablero (streamlit.testing AppTest)
+- Importaciones del script principal antes de dibujar la primera sección: las de antes de
+  separar las secciones (incluían graficos -> plotly.express) contra las actuales, cada una
+  en un proceso nuevo.
+- Primera ejecución completa de Reto2.py en un proceso nuevo.
+- Cambio de socio, de fechas y de año: rerun completo contra rerun solo del fragmento.
+Uso: python benchmarks/bench_arranque.py [--db /tmp/qqa_bench/contabilidad_1000000.db] [--repeticiones 5]
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+IMPORTACIONES_ANTES = ("instrumentacion", "cache_consultas", "caja", "conexion", "cxc", "egresos", "etl",
+                       "graficos", "muestreo")
+IMPORTACIONES_AHORA = ("instrumentacion", "cache_consultas", "cxc", "tablero")
+
+
+def _hijo(modo: str, modulos: list) -> None:
+    """Se ejecuta en un proceso nuevo e imprime el tiempo medido en segundos."""
+    sys.path.insert(0, str(RAIZ))
+    import importlib
+    import streamlit  # noqa: F401  (común a ambos casos; no se cuenta)
+    if modo == "importar":
+        inicio = time.perf_counter()
+        for modulo in modulos:
+            importlib.import_module(modulo)
+    else:
+        from streamlit.testing.v1 import AppTest
+        inicio = time.perf_counter()
+        AppTest.from_file(str(RAIZ / "Reto2.py"), default_timeout=600).run()
+    print(time.perf_counter() - inicio)
+
+
+def _en_proceso_nuevo(modo: str, modulos: tuple = ()) -> float:
+    salida = subprocess.run(
+        [sys.executable, __file__, "--hijo", modo, *modulos],
+        capture_output=True, text=True, check=True,
+    )
+    return float(salida.stdout.strip().splitlines()[-1])
+
+
+def _reruns(repeticiones: int) -> dict:
+    """Mediana en ms de cada interacción, con rerun completo y con rerun del fragmento."""
+    sys.path.insert(0, str(RAIZ))
+    from streamlit.testing.v1 import AppTest
+    import streamlit.testing.v1.local_script_runner as runner
+
+    rerun_data = runner.RerunData
+    at = AppTest.from_file(str(RAIZ / "Reto2.py"), default_timeout=600).run()
+
+    def seleccionar_seccion(indice: int):
+        at.sidebar.radio[0].set_value(at.sidebar.radio[0].options[indice]).run()
+        # Con una sola sección dibujada hay un solo fragmento registrado
+        return list(at._fragment_storage._fragments)[-1]
+
+    def cambiar_socio(i):
+        opciones = at.selectbox[0].options
+        at.selectbox[0].set_value(opciones[1 + i % (len(opciones) - 1)])
+
+    def cambiar_fechas(i):
+        at.date_input[0].set_value(dt.date(2025, 1 + i % 6, 1))
+
+    def cambiar_anio(i):
+        opciones = at.selectbox[0].options
+        at.selectbox[0].set_value(opciones[i % len(opciones)])
+
+    interacciones = (("socio CXC 2025", 2, cambiar_socio), ("fechas Top 10", 1, cambiar_fechas),
+                     ("año Caja mensual", 0, cambiar_anio))
+    resultados = {}
+    for nombre, indice, cambiar in interacciones:
+        fragmento = seleccionar_seccion(indice)
+        tiempos = {}
+        for modo in ("completo", "fragmento"):
+            runner.RerunData = rerun_data if modo == "completo" else (
+                lambda **kw: rerun_data(fragment_id_queue=[fragmento], is_fragment_scoped_rerun=True, **kw))
+            muestras = []
+            for i in range(repeticiones):
+                cambiar(i)
+                inicio = time.perf_counter()
+                at.run()
+                muestras.append((time.perf_counter() - inicio) * 1000)
+            runner.RerunData = rerun_data
+            tiempos[modo] = statistics.median(muestras)
+            if modo == "fragmento":
+                at.run()   # vuelve a dibujar la página completa antes de cambiar de sección
+        resultados[nombre] = tiempos
+    return resultados
+
+
+def main() -> None:
+    if len(sys.argv) > 2 and sys.argv[1] == "--hijo":
+        _hijo(sys.argv[2], sys.argv[3:])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=str(RAIZ / "contabilidad.db"))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    if not Path(args.db).exists():
+        raise SystemExit(f"No existe {args.db} (se genera con benchmarks/generador.py)")
+
+    # El tablero abre "contabilidad.db" relativo al directorio de trabajo
+    carpeta = tempfile.mkdtemp(prefix="qqa_arranque_")
+    os.symlink(Path(args.db).resolve(), Path(carpeta) / "contabilidad.db")
+    os.chdir(carpeta)
+
+    mediana = lambda f: statistics.median(f() for _ in range(args.repeticiones))  # noqa: E731
+    informe = {
+        "db": args.db,
+        "importaciones_antes_ms": mediana(lambda: _en_proceso_nuevo("importar", IMPORTACIONES_ANTES)) * 1000,
+        "importaciones_ahora_ms": mediana(lambda: _en_proceso_nuevo("importar", IMPORTACIONES_AHORA)) * 1000,
+        "primera_ejecucion_ms": mediana(lambda: _en_proceso_nuevo("arranque")) * 1000,
+        "reruns_ms": _reruns(args.repeticiones),
+    }
+    print(json.dumps(informe, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Tiempo de la conciliación de saldos sobre una base sintética y del recálculo a gran escala
+Mide `conciliar` completo (carga, orden, recálculo y resumen), la segunda llamada por
+`resumen` (caché por versión de datos) y, con arreglos sintéticos, el recálculo vectorizado
+solo, para decenas de millones de filas.
+Uso: python benchmarks/bench_conciliacion.py [--db /tmp/qqa_bench/contabilidad_2000000.db] [--filas 10000000,50000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import conciliacion  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+from instantanea import asegurar_instantanea, disponible  # noqa: E402
+
+
+def _segundos(funcion, *args) -> float:
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def recalculo_sintetico(filas: int, grupos: int = 5000, semilla: int = 3) -> float:
+    """Segundos de `recalcular` para `filas` movimientos repartidos en `grupos` cuentas."""
+    rng = np.random.default_rng(semilla)
+    grupo = np.sort(rng.integers(0, grupos, filas))
+    delta = rng.integers(-500, 500, filas).astype(float) * 1000
+    saldo = conciliacion.acumulado_por_grupo(grupo, delta)
+    saldo[rng.integers(0, filas, 100)] += 1000   # algunos saldos mal digitados
+    return _segundos(conciliacion.recalcular, grupo, np.maximum(delta, 0), np.maximum(-delta, 0),
+                     saldo, np.zeros(grupos))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--filas", default="10000000,50000000")
+    args = parser.parse_args()
+
+    asegurar_modelo(args.db)
+    if disponible():
+        asegurar_instantanea(args.db)
+    tablas = conciliacion.tablas_con_saldo(args.db)
+    print(f"{args.db}: {len(tablas)} tablas con saldo corrido · instantánea Arrow: {'sí' if disponible() else 'no'}")
+    print(f"  conciliar (primera vez): {_segundos(conciliacion.conciliar, args.db):.2f} s")
+    print(f"  conciliar (caché de páginas caliente): {_segundos(conciliacion.conciliar, args.db):.2f} s")
+    conciliacion.resumen(args.db)
+    print(f"  resumen con la misma versión de datos: {_segundos(conciliacion.resumen, args.db) * 1000:.1f} ms")
+
+    print("\nrecálculo vectorizado (arreglos en memoria, 5 000 cuentas)")
+    for filas in (int(f) for f in args.filas.split(",")):
+        print(f"  {filas:>12,} filas: {recalculo_sintetico(filas):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
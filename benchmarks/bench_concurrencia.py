@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Sesiones concurrentes del tablero justo después de una actualización de datos (caché vacía)
+Cada sesión simulada es un hilo (como en Streamlit) que recorre todas las secciones: años y
+Caja mensual, Top 10 egresos y CXC de cada año. Todas arrancan a la vez. Se compara el
+comportamiento anterior (cada sesión ejecuta su fallo de caché en la conexión compartida)
+con el coordinador (una ejecución por consulta en curso, pool de conexiones de lectura).
+Reporta ejecuciones reales contra la base, latencia p50/p95 por consulta y duración total.
+Uso: python benchmarks/bench_concurrencia.py [--db /tmp/qqa_bench/contabilidad_2000000.db] [--sesiones 1,8,32]
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cache_consultas import CacheConsultas  # noqa: E402
+from caja import CONSULTA_ANIOS_CAJA, CONSULTA_CAJA_MENSUAL  # noqa: E402
+from coordinador import Coordinador, clave_consulta  # noqa: E402
+from cxc import CONSULTA_CXC, CXC_ANIOS, parametros_cxc  # noqa: E402
+from egresos import CONSULTA_EGRESOS_DIARIOS  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+from instantanea import asegurar_instantanea, disponible, leer  # noqa: E402
+
+# Recorrido de una sesión por todas las secciones del tablero
+VISITA = (
+    (CONSULTA_ANIOS_CAJA, ()),
+    (CONSULTA_CAJA_MENSUAL, (2025,)),
+    (CONSULTA_EGRESOS_DIARIOS, ()),
+    *((CONSULTA_CXC, parametros_cxc(anio)) for anio in CXC_ANIOS),
+)
+
+
+def simular(sesiones: int, db: str, coordinado: bool) -> dict:
+    """Lanza `sesiones` hilos a la vez sobre una caché vacía y mide cada consulta."""
+    cache = CacheConsultas()
+    coordinador = Coordinador() if coordinado else None
+    ejecuciones = [0]
+    candado = threading.Lock()
+    latencias = []
+    barrera = threading.Barrier(sesiones)
+
+    def contada(query, params, db_path):
+        with candado:
+            ejecuciones[0] += 1
+        return leer(query, params, db_path)
+
+    def sesion():
+        barrera.wait()
+        for query, params in VISITA:
+            if coordinado:
+                cargar = lambda: coordinador.ejecutar(clave_consulta(query, params, db), contada, query, params, db)  # noqa: E731
+            else:
+                cargar = lambda: contada(query, params, db)  # noqa: E731
+            inicio = time.perf_counter()
+            cache.obtener(query, params, db, cargar)
+            with candado:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+    hilos = [threading.Thread(target=sesion) for _ in range(sesiones)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    return {
+        "ejecuciones": ejecuciones[0],
+        "p50_ms": statistics.median(latencias),
+        "p95_ms": float(np.percentile(latencias, 95)),
+        "total_s": total,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--sesiones", default="1,8,32")
+    parser.add_argument("--rondas", type=int, default=3, help="Repeticiones por caso; se reporta la mediana")
+    args = parser.parse_args()
+
+    asegurar_modelo(args.db)
+    if disponible():
+        asegurar_instantanea(args.db)
+    print(f"{len(VISITA)} consultas por sesión · instantánea Arrow: {'sí' if disponible() else 'no'}\n")
+    print(f"{'sesiones':>9}  {'modo':<12}{'ejecuciones':>12}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for sesiones in (int(n) for n in args.sesiones.split(",")):
+        for modo, coordinado in (("anterior", False), ("coordinado", True)):
+            rondas = [simular(sesiones, args.db, coordinado) for _ in range(args.rondas)]
+            r = {k: statistics.median(ronda[k] for ronda in rondas) for k in rondas[0]}
+            print(f"{sesiones:>9}  {modo:<12}{r['ejecuciones']:>12.0f}{r['p50_ms']:>10.1f}"
+                  f"{r['p95_ms']:>10.1f}{r['total_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
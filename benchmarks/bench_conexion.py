@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: consultas por segundo con conexión por llamada vs conexión compartida
+Uso: python benchmarks/bench_conexion.py [--db contabilidad.db] [--repeticiones 2000]
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conexion import consultar, cerrar_conexiones  # noqa: E402
+
+# Consulta de Top 10 egresos y serie por socio, con los valores que cambian en cada rerun
+CONSULTA_TOP = """
+    SELECT detalle AS concepto,
+           ROUND(SUM(COALESCE(prestamo,0)),2) AS total_egreso
+    FROM caja2025
+    WHERE fecha BETWEEN {inicio} AND {fin}
+    GROUP BY detalle
+    ORDER BY total_egreso DESC
+    LIMIT 10;
+"""
+CONSULTA_SOCIO = """
+    SELECT fecha, ROUND(CAST(salida AS FLOAT), 2) AS ingreso
+    FROM cxc2025
+    WHERE TRIM(codigo_cliente) = {codigo}
+      AND CAST(salida AS FLOAT) > 0
+    ORDER BY fecha;
+"""
+
+
+def _parametros(i: int):
+    """Genera rangos de fechas y códigos distintos en cada iteración."""
+    dia = 1 + i % 28
+    mes = 1 + i % 12
+    return (f"2025-01-{dia:02d}", f"2025-{mes:02d}-28"), (str(1 + i % 10),)
+
+
+def por_llamada(db_path: str, n: int) -> float:
+    """Camino original: sqlite3.connect + SQL con valores interpolados en cada consulta."""
+    inicio = time.perf_counter()
+    for i in range(n):
+        fechas, codigo = _parametros(i)
+        with sqlite3.connect(db_path) as conn:
+            pd.read_sql_query(CONSULTA_TOP.format(inicio=f"'{fechas[0]}'", fin=f"'{fechas[1]}'"), conn)
+        with sqlite3.connect(db_path) as conn:
+            pd.read_sql_query(CONSULTA_SOCIO.format(codigo=f"'{codigo[0]}'"), conn)
+    return 2 * n / (time.perf_counter() - inicio)
+
+
+def compartida(db_path: str, n: int) -> float:
+    """Camino nuevo: conexión de solo lectura del proceso y parámetros enlazados."""
+    top = CONSULTA_TOP.format(inicio="?", fin="?")
+    socio = CONSULTA_SOCIO.format(codigo="?")
+    inicio = time.perf_counter()
+    for i in range(n):
+        fechas, codigo = _parametros(i)
+        consultar(top, fechas, db_path)
+        consultar(socio, codigo, db_path)
+    return 2 * n / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    qps_antes = por_llamada(args.db, args.repeticiones)
+    qps_despues = compartida(args.db, args.repeticiones)
+    cerrar_conexiones()
+
+    print(f"conexión por llamada : {qps_antes:10.1f} consultas/s")
+    print(f"conexión compartida  : {qps_despues:10.1f} consultas/s")
+    print(f"aceleración          : {qps_despues / qps_antes:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: latencia por cambio de socio en Ingresos por socio (CXC)
+Compara una consulta SQL por socio (camino anterior) con el filtro en memoria del motor CXC.
+Uso: python benchmarks/bench_cxc.py [--db contabilidad.db] [--anio 2024] [--cambios 500]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conexion import consultar, cerrar_conexiones  # noqa: E402
+from cxc import CONSULTA_CXC, CXC_ANIOS, lista_socios, parametros_cxc, serie_socio, totales_por_socio  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+
+CONSULTA_SOCIO_SQL = """
+    SELECT fecha, ROUND(credit, 2) AS ingreso
+    FROM movimientos
+    WHERE source = 'cxc' AND year = ?
+      AND socio_id = ?
+      AND credit > 0
+    ORDER BY fecha;
+"""
+
+
+def _resumen(nombre: str, tiempos: list) -> None:
+    tiempos = sorted(tiempos)
+    p95 = tiempos[int(0.95 * (len(tiempos) - 1))]
+    print(f"{nombre:<28} mediana {statistics.median(tiempos) * 1e3:8.3f} ms   p95 {p95 * 1e3:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--anio", type=int, default=2024, choices=sorted(CXC_ANIOS))
+    parser.add_argument("--cambios", type=int, default=500)
+    args = parser.parse_args()
+
+    asegurar_modelo(args.db)
+    inicio = time.perf_counter()
+    df_cxc = consultar(CONSULTA_CXC, parametros_cxc(args.anio), args.db)
+    carga = time.perf_counter() - inicio
+    socios = list(lista_socios(df_cxc))
+    print(f"carga única del año {args.anio}: {carga * 1e3:.3f} ms ({len(df_cxc)} filas, {len(socios)} socios)")
+
+    sql, memoria = [], []
+    for i in range(args.cambios):
+        socio_id = socios[i % len(socios)]
+        t = time.perf_counter()
+        consultar(CONSULTA_SOCIO_SQL, (args.anio, int(socio_id)), args.db)
+        sql.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        serie_socio(df_cxc, socio_id)
+        memoria.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    totales_por_socio(df_cxc)
+    print(f"totales por socio en memoria: {(time.perf_counter() - t) * 1e3:.3f} ms")
+    _resumen("consulta SQL por socio", sql)
+    _resumen("filtro en memoria", memoria)
+    cerrar_conexiones()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Top 10 egresos en rangos arbitrarios con el índice de sumas acumuladas
+Genera un libro sintético de caja, construye el índice y mide rangos aleatorios contra
+el GROUP BY equivalente en pandas sobre las filas crudas.
+Uso: python benchmarks/bench_egresos.py [--filas 2000000] [--conceptos 5000] [--consultas 500]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from egresos import IndiceEgresos  # noqa: E402
+
+
+def libro_sintetico(filas: int, conceptos: int, semilla: int = 7) -> pd.DataFrame:
+    """Filas crudas (detalle, day, credit) entre 2020 y 2025 con conceptos sesgados (Zipf)."""
+    rng = np.random.default_rng(semilla)
+    dias = np.datetime64("2020-01-01") + rng.integers(0, 6 * 365, filas).astype("timedelta64[D]")
+    concepto = np.minimum(rng.zipf(1.3, filas), conceptos) - 1
+    return pd.DataFrame({
+        "detalle": np.char.add("concepto ", concepto.astype(str)),
+        "day": dias.astype(str),
+        "credit": rng.integers(1_000, 2_000_000, filas).astype(float),
+    })
+
+
+def _resumen(nombre: str, tiempos: list) -> None:
+    tiempos = sorted(tiempos)
+    p95 = tiempos[int(0.95 * (len(tiempos) - 1))]
+    print(f"{nombre:<24} mediana {statistics.median(tiempos) * 1e3:9.3f} ms   p95 {p95 * 1e3:9.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=2_000_000)
+    parser.add_argument("--conceptos", type=int, default=5_000)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    crudo = libro_sintetico(args.filas, args.conceptos)
+    t = time.perf_counter()
+    diario = crudo.groupby(["detalle", "day"], as_index=False).agg(credit=("credit", "sum"), filas=("credit", "size"))
+    indice = IndiceEgresos(diario)
+    representacion = "denso" if indice.densa else "disperso"
+    print(f"{args.filas} filas, {len(diario)} pares (concepto, día): índice {representacion} en {time.perf_counter() - t:.2f} s")
+
+    rng = np.random.default_rng(1)
+    inicios = np.datetime64("2020-01-01") + rng.integers(0, 6 * 365, args.consultas).astype("timedelta64[D]")
+    rangos = [(a, a + np.timedelta64(int(d), "D")) for a, d in zip(inicios, rng.integers(0, 900, args.consultas))]
+
+    tiempos_indice = []
+    for a, b in rangos:
+        t = time.perf_counter()
+        indice.top(a, b, 10)
+        tiempos_indice.append(time.perf_counter() - t)
+
+    tiempos_crudo = []
+    for a, b in rangos[:20]:
+        t = time.perf_counter()
+        en_rango = crudo[(crudo["day"] >= str(a)) & (crudo["day"] <= str(b))]
+        en_rango.groupby("detalle")["credit"].sum().nlargest(10)
+        tiempos_crudo.append(time.perf_counter() - t)
+
+    _resumen("índice + argpartition", tiempos_indice)
+    _resumen("group by sobre filas", tiempos_crudo)
+
+
+if __name__ == "__main__":
+    main()
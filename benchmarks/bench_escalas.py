@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de escalabilidad del tablero sobre bases sintéticas
+Para cada escala genera (o reutiliza) una contabilidad.db con benchmarks/generador.py y mide:
+las consultas originales sobre las tablas crudas (uniones con TRIM, substr(fecha,1,7), top 10),
+la construcción del modelo, las consultas actuales y la construcción de DataFrames y figuras.
+Uso: python benchmarks/bench_escalas.py --escalas 10000,100000,1000000 [--dir /tmp/qqa] [--json resultados.json]
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from caja import CONSULTA_CAJA_MENSUAL  # noqa: E402
+from conexion import cerrar_conexiones, consultar  # noqa: E402
+from cxc import CONSULTA_CXC, lista_socios, parametros_cxc, serie_socio, totales_por_socio  # noqa: E402
+from egresos import CONSULTA_EGRESOS_DIARIOS, IndiceEgresos  # noqa: E402
+from etl import construir_modelo  # noqa: E402
+from generador import generar  # noqa: E402
+
+# Consultas tal como estaban en Reto2.py antes del modelo unificado
+CONSULTAS_ORIGINALES = {
+    "caja_mensual": ("""
+        SELECT substr(fecha,1,7) AS mes,
+               ROUND(SUM(COALESCE(abono,0)),2) AS total_ingresos,
+               ROUND(SUM(COALESCE(prestamo,0)),2) AS total_egresos
+        FROM caja2025 GROUP BY mes ORDER BY mes
+    """, ()),
+    "top10_egresos": ("""
+        SELECT detalle AS concepto, ROUND(SUM(COALESCE(prestamo,0)),2) AS total_egreso
+        FROM caja2025 WHERE fecha BETWEEN ? AND ?
+        GROUP BY detalle ORDER BY total_egreso DESC LIMIT 10
+    """, ("2025-03-01", "2025-09-30")),
+    "cxc_todos_los_socios": ("""
+        SELECT COALESCE(s.nombre, 'Socio no identificado') AS socio,
+               ROUND(SUM(CAST(c.salida AS FLOAT)), 2) AS total_ingreso
+        FROM socios2024 s
+        LEFT JOIN cxc2025 c ON TRIM(s.codigo) = TRIM(c.codigo_cliente)
+        WHERE CAST(c.salida AS FLOAT) > 0
+        GROUP BY s.nombre ORDER BY total_ingreso DESC
+    """, ()),
+    "cxc_un_socio": ("""
+        SELECT fecha, ROUND(CAST(salida AS FLOAT), 2) AS ingreso
+        FROM cxc2025
+        WHERE TRIM(codigo_cliente) = ? AND CAST(salida AS FLOAT) > 0
+        ORDER BY fecha
+    """, ("1",)),
+}
+
+# La unión con TRIM es cuadrática (socios x filas de cxc); por encima de este tamaño se omite.
+MAX_FILAS_UNION_TRIM = 2_000_000
+
+
+def _medir(funcion, repeticiones: int = 3):
+    """Mejor tiempo de `repeticiones` corridas (segundos) y el resultado de la última."""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def medir_escala(db: Path, filas: int, repeticiones: int) -> dict:
+    resultado = {"filas": filas, "consultas_originales_s": {}, "consultas_s": {}, "figuras_s": {}}
+
+    conn = sqlite3.connect(db)
+    for nombre, (sql, params) in CONSULTAS_ORIGINALES.items():
+        if nombre == "cxc_todos_los_socios" and filas > MAX_FILAS_UNION_TRIM:
+            resultado["consultas_originales_s"][nombre] = None
+            continue
+        t, _ = _medir(lambda: pd.read_sql_query(sql, conn, params=params), repeticiones)
+        resultado["consultas_originales_s"][nombre] = t
+    conn.close()
+
+    inicio = time.perf_counter()
+    construir_modelo(str(db))
+    resultado["construir_modelo_s"] = time.perf_counter() - inicio
+
+    db = str(db)
+    consultas = resultado["consultas_s"]
+    consultas["caja_mensual"], df_caja = _medir(lambda: consultar(CONSULTA_CAJA_MENSUAL, (2025,), db), repeticiones)
+    consultas["indice_egresos_carga"], indice = _medir(
+        lambda: IndiceEgresos(consultar(CONSULTA_EGRESOS_DIARIOS, (), db)), 1)
+    consultas["top10_egresos"], df_top = _medir(
+        lambda: indice.top(dt.date(2025, 3, 1), dt.date(2025, 9, 30), 10), repeticiones)
+    consultas["cxc_carga_anio"], df_cxc = _medir(lambda: consultar(CONSULTA_CXC, parametros_cxc(2025), db), repeticiones)
+    consultas["cxc_todos_los_socios"], df_all = _medir(lambda: totales_por_socio(df_cxc), repeticiones)
+    socio_id, socio = next(iter(lista_socios(df_cxc).items()))
+    consultas["cxc_un_socio"], df_socio = _medir(lambda: serie_socio(df_cxc, socio_id), repeticiones)
+    cerrar_conexiones()
+
+    # Construcción y serialización de las figuras (lo que Streamlit envía al navegador)
+    from graficos import fig_caja_mensual, fig_serie_socio, fig_top_egresos, fig_totales_socios
+    figuras = {
+        "caja_mensual": lambda: fig_caja_mensual(df_caja, 2025),
+        "top10_egresos": lambda: fig_top_egresos(df_top),
+        "cxc_todos_los_socios": lambda: fig_totales_socios(df_all, 2025),
+        "cxc_un_socio": lambda: fig_serie_socio(df_socio, socio, 2025),
+    }
+    for nombre, construir in figuras.items():
+        t, fig = _medir(lambda: construir().to_json(), repeticiones)
+        resultado["figuras_s"][nombre] = t
+        resultado["figuras_s"][nombre + "_bytes"] = len(fig)
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--escalas", default="10000,100000,1000000",
+                        help="Filas de movimientos por escala, separadas por coma (10k a 50M)")
+    parser.add_argument("--dir", default="/tmp/qqa_bench", help="Carpeta de las bases generadas (se reutilizan)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", default=None, help="Archivo de salida; por defecto se imprime en pantalla")
+    args = parser.parse_args()
+
+    carpeta = Path(args.dir)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    informe = {
+        "fecha": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "escalas": [],
+    }
+    for filas in (int(e) for e in args.escalas.split(",")):
+        db = carpeta / f"contabilidad_{filas}.db"
+        if not db.exists():
+            inicio = time.perf_counter()
+            generar(str(db), filas)
+            print(f"generada {db} en {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+        informe["escalas"].append(medir_escala(db, filas, args.repeticiones))
+
+    texto = json.dumps(informe, indent=2)
+    if args.json:
+        Path(args.json).write_text(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
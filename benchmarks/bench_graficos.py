@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tamaño del JSON de Plotly y tiempo de construcción de las figuras CXC, antes y después del
+submuestreo LTTB, WebGL y la barra "Otros", sobre una base sintética grande.
+El tiempo de dibujo en el navegador no se mide aquí; el JSON es lo que Streamlit le envía.
+Uso: python benchmarks/bench_graficos.py [--filas 2000000] [--dir /tmp/qqa_bench]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import plotly.express as px
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from conexion import consultar  # noqa: E402
+from cxc import CONSULTA_CXC, lista_socios, parametros_cxc, serie_socio, totales_por_socio  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+from generador import generar  # noqa: E402
+from graficos import fig_serie_socio, fig_totales_socios  # noqa: E402
+
+
+# Versiones anteriores: todos los puntos y todas las barras, en SVG
+def fig_totales_antes(df_all, anio):
+    fig = px.bar(df_all, x="socio", y="total_ingreso", text="total_ingreso",
+                 color="total_ingreso", color_continuous_scale="Blues")
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    return fig
+
+
+def fig_serie_antes(df_socio, socio, anio):
+    return px.line(df_socio, x="fecha", y="ingreso", markers=True, color_discrete_sequence=["#2ca02c"])
+
+
+def medir(construir, repeticiones: int) -> tuple:
+    """(mejor tiempo en ms de construir + serializar, bytes del JSON)."""
+    mejor, tamano = float("inf"), 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        texto = construir().to_json()
+        mejor = min(mejor, time.perf_counter() - inicio)
+        tamano = len(texto)
+    return mejor * 1000, tamano
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=2_000_000)
+    parser.add_argument("--dir", default="/tmp/qqa_bench")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    db = Path(args.dir) / f"contabilidad_{args.filas}.db"
+    if not db.exists():
+        db.parent.mkdir(parents=True, exist_ok=True)
+        generar(str(db), args.filas)
+    asegurar_modelo(str(db))
+
+    df_cxc = consultar(CONSULTA_CXC, parametros_cxc(2025), str(db))
+    df_all = totales_por_socio(df_cxc)
+    # El socio con más cobros es el peor caso de la serie temporal
+    socio_id = df_cxc.dropna(subset=["ingreso"])["socio_id"].value_counts().index[0]
+    socio = lista_socios(df_cxc)[socio_id]
+    df_socio = serie_socio(df_cxc, socio_id)
+    print(f"base: {db} · {len(df_all)} socios · serie de {socio}: {len(df_socio):,} cobros\n")
+
+    casos = (
+        ("Todos los socios", lambda: fig_totales_antes(df_all, 2025), lambda: fig_totales_socios(df_all, 2025)),
+        ("Serie de un socio", lambda: fig_serie_antes(df_socio, socio, 2025), lambda: fig_serie_socio(df_socio, socio, 2025)),
+    )
+    print(f"{'figura':<20}{'antes ms':>10}{'antes KB':>12}{'después ms':>12}{'después KB':>12}")
+    for nombre, antes, despues in casos:
+        t_antes, b_antes = medir(antes, args.repeticiones)
+        t_despues, b_despues = medir(despues, args.repeticiones)
+        print(f"{nombre:<20}{t_antes:>10.1f}{b_antes / 1024:>12,.0f}{t_despues:>12.1f}{b_despues / 1024:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
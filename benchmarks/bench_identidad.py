@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Historia de un socio en todos los años: uniones por texto año por año contra un socio_id
+Antes, ver a un socio en varios años exigía una consulta por tabla con TRIM sobre el código
+(o el nombre en cxc2020), que no usa índices. Con la identidad de socios es una sola
+búsqueda por socio_id en ix_movimientos_socio_fecha.
+Uso: python benchmarks/bench_identidad.py [--db /tmp/qqa_bench/contabilidad_2000000.db] [--socios 20] [--orden ocasionales]
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conexion import consultar  # noqa: E402
+from etl import asegurar_modelo, columnas_socio, tablas_fuente  # noqa: E402
+from identidad import CONSULTA_MOVIMIENTOS_SOCIO  # noqa: E402
+
+
+def consultas_por_tabla(db_path: str) -> list:
+    """Una consulta por tabla de movimientos con socio, comparando el código como texto."""
+    conn = sqlite3.connect(db_path)
+    try:
+        consultas = []
+        for tabla, _, _ in tablas_fuente(conn):
+            codigo, _ = columnas_socio(conn, tabla)
+            if codigo:
+                consultas.append(f'SELECT * FROM "{tabla}" WHERE TRIM(CAST("{codigo}" AS INTEGER)) = TRIM(?)')
+        return consultas
+    finally:
+        conn.close()
+
+
+def _ms(funcion) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--socios", type=int, default=20)
+    parser.add_argument("--orden", choices=("frecuentes", "ocasionales"), default="ocasionales",
+                        help="Socios con más movimientos (códigos bajos) o con pocos (códigos altos)")
+    args = parser.parse_args()
+
+    asegurar_modelo(args.db)
+    socios = consultar("SELECT socio_id, codigo FROM socios_identidad WHERE codigo IS NOT NULL "
+                       f"ORDER BY codigo {'ASC' if args.orden == 'frecuentes' else 'DESC'} LIMIT ?",
+                       (args.socios,), args.db)
+    consultas = consultas_por_tabla(args.db)
+    antes, despues, filas_antes, filas_despues = [], [], 0, 0
+    for socio_id, codigo in socios.itertuples(index=False):
+        antes.append(_ms(lambda: [consultar(q, (str(codigo),), args.db) for q in consultas]))
+        despues.append(_ms(lambda: consultar(CONSULTA_MOVIMIENTOS_SOCIO, (int(socio_id),), args.db)))
+        filas_antes += sum(len(consultar(q, (str(codigo),), args.db)) for q in consultas)
+        filas_despues += len(consultar(CONSULTA_MOVIMIENTOS_SOCIO, (int(socio_id),), args.db))
+
+    print(f"{len(socios)} socios · {len(consultas)} tablas con código de socio")
+    print(f"por tabla con TRIM:  mediana {statistics.median(antes):9.1f} ms  ({filas_antes:,} filas)")
+    print(f"por socio_id:        mediana {statistics.median(despues):9.1f} ms  ({filas_despues:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
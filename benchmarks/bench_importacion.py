@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Carga masiva con importacion.py: filas por segundo, memoria máxima y lecturas concurrentes
+Escribe CSV sintéticos para caja2025 (uno por tamaño), los importa en una copia de una base
+sintética en un proceso aparte (para medir su pico de memoria) y, mientras tanto, consulta
+Caja mensual desde otra conexión de solo lectura, como lo haría el tablero.
+Por último reimporta el archivo más grande para medir el descarte de duplicados.
+Uso: python benchmarks/bench_importacion.py [--filas 100000,1000000] [--base /tmp/qqa_bench/contabilidad_100000.db]
+"""
+
+import argparse
+import csv
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from caja import CONSULTA_CAJA_MENSUAL  # noqa: E402
+from conexion import abrir_conexion  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+
+
+def escribir_csv(ruta: Path, filas: int, semilla: int = 7) -> None:
+    """CSV de caja2025 escrito por bloques, con ~0,5 % de filas inválidas."""
+    rng = np.random.default_rng(semilla)
+    with open(ruta, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["codigo_cliente", "fecha", "categoria", "detalle", "prestamo", "abono", "saldo"])
+        for inicio in range(0, filas, 100_000):
+            n = min(100_000, filas - inicio)
+            dias = rng.integers(0, 365, n)
+            fechas = (np.datetime64("2025-01-01") + dias).astype(str)
+            montos = rng.integers(1, 500, n) * 1000
+            entrada = rng.random(n) < 0.4
+            for i in range(n):
+                codigo = "x" if rng.random() < 0.005 else int(rng.integers(1, 200))
+                escritor.writerow([codigo, fechas[i], "ventas" if entrada[i] else "compras",
+                                   f"movimiento {inicio + i}", montos[i] if entrada[i] else 0,
+                                   0 if entrada[i] else montos[i], ""])
+
+
+def _hijo(archivo: str, db: str) -> None:
+    """Importa en este proceso e imprime el resultado con el pico de memoria (VmHWM)."""
+    from importacion import importar
+    resultado = importar(archivo, "caja2025", db)
+    for linea in Path("/proc/self/status").read_text().splitlines():
+        if linea.startswith("VmHWM:"):
+            resultado["pico_mb"] = int(linea.split()[1]) / 1024
+    print(json.dumps(resultado))
+
+
+def importar_con_lecturas(archivo: Path, db: Path) -> dict:
+    """Corre la importación en un proceso aparte y mide lecturas concurrentes mientras dura."""
+    latencias, errores = [], []
+    proceso = subprocess.Popen([sys.executable, __file__, "--hijo", str(archivo), str(db)],
+                               stdout=subprocess.PIPE, text=True)
+
+    def leer():
+        while proceso.poll() is None:
+            try:
+                conn = abrir_conexion(str(db))
+                inicio = time.perf_counter()
+                conn.execute(CONSULTA_CAJA_MENSUAL, (2025,)).fetchall()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                conn.close()
+            except Exception as e:   # noqa: BLE001  se reporta, no se detiene la medición
+                errores.append(str(e))
+            time.sleep(0.05)
+
+    lector = threading.Thread(target=leer)
+    lector.start()
+    salida, _ = proceso.communicate()
+    lector.join()
+    resultado = json.loads(salida.strip().splitlines()[-1])
+    resultado["lecturas_concurrentes"] = len(latencias)
+    resultado["lectura_p50_ms"] = round(statistics.median(latencias), 1) if latencias else None
+    resultado["lectura_max_ms"] = round(max(latencias), 1) if latencias else None
+    resultado["errores_de_lectura"] = len(errores)
+    return resultado
+
+
+def main() -> None:
+    if len(sys.argv) > 3 and sys.argv[1] == "--hijo":
+        _hijo(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", default="100000,1000000")
+    parser.add_argument("--base", default="/tmp/qqa_bench/contabilidad_100000.db",
+                        help="Base sintética de partida (benchmarks/generador.py); se trabaja sobre una copia")
+    parser.add_argument("--dir", default="/tmp/qqa_bench")
+    args = parser.parse_args()
+
+    carpeta = Path(args.dir)
+    asegurar_modelo(args.base)
+    tamanos = [int(f) for f in args.filas.split(",")]
+    for filas in tamanos:
+        archivo = carpeta / f"caja2025_{filas}.csv"
+        if not archivo.exists():
+            escribir_csv(archivo, filas)
+        db = carpeta / f"importacion_{filas}.db"
+        shutil.copy(args.base, db)
+        resultado = importar_con_lecturas(archivo, db)
+        print(f"{filas:>10,} filas: {json.dumps(resultado, ensure_ascii=False)}")
+
+    print("reimportación (todo duplicado):", json.dumps(importar_con_lecturas(archivo, db), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite (pd.read_sql_query) contra la instantánea Arrow mapeada en memoria
+Mide el tiempo de cada lectura del tablero y, en procesos separados, la memoria máxima (RSS)
+de cargar el libro completo de movimientos y los cobros CXC de un año, separando la memoria
+privada del proceso (RssAnon) de las páginas de archivo compartibles entre procesos (RssFile).
+Uso: python benchmarks/bench_instantanea.py [--db /tmp/qqa_bench/contabilidad_2000000.db] [--repeticiones 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from caja import CONSULTA_CAJA_MENSUAL  # noqa: E402
+from conexion import consultar  # noqa: E402
+from cxc import CONSULTA_CXC, parametros_cxc  # noqa: E402
+from egresos import CONSULTA_EGRESOS_DIARIOS  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+import instantanea  # noqa: E402
+
+LECTURAS = (
+    ("egresos diarios", CONSULTA_EGRESOS_DIARIOS, ()),
+    ("caja mensual 2025", CONSULTA_CAJA_MENSUAL, (2025,)),
+    ("cobros CXC 2025", CONSULTA_CXC, parametros_cxc(2025)),
+)
+
+
+def _memoria_mb() -> dict:
+    """Pico de RSS y RSS actual privado / de archivos, de /proc/self/status (Linux)."""
+    campos = {}
+    for linea in Path("/proc/self/status").read_text().splitlines():
+        clave, _, valor = linea.partition(":")
+        if clave in ("VmHWM", "RssAnon", "RssFile"):
+            campos[clave] = int(valor.split()[0]) / 1024
+    return campos
+
+
+def _hijo(modo: str, db: str) -> None:
+    """Carga en un proceso nuevo e imprime el tiempo y la memoria."""
+    inicio = time.perf_counter()
+    if modo == "sqlite_movimientos":
+        datos = consultar("SELECT * FROM movimientos", (), db)
+        total = float(datos["credit"].sum())
+    elif modo == "arrow_movimientos":
+        datos = instantanea.tabla(instantanea.carpeta_instantanea(db), "movimientos")
+        total = float(instantanea.pc.sum(datos["credit"]).as_py())
+    elif modo == "sqlite_cxc":
+        total = len(consultar(CONSULTA_CXC, parametros_cxc(2025), db))
+    else:
+        total = len(instantanea.cobros_cxc(instantanea.carpeta_instantanea(db), *parametros_cxc(2025)))
+    ms = (time.perf_counter() - inicio) * 1000
+    print(json.dumps({"ms": ms, **_memoria_mb(), "control": total}))
+
+
+def _en_proceso_nuevo(modo: str, db: str) -> dict:
+    salida = subprocess.run([sys.executable, __file__, "--hijo", modo, db], capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    if len(sys.argv) > 3 and sys.argv[1] == "--hijo":
+        _hijo(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    if not instantanea.disponible():
+        raise SystemExit("Requiere pyarrow: pip install pyarrow")
+
+    asegurar_modelo(args.db)
+    inicio = time.perf_counter()
+    carpeta = instantanea.asegurar_instantanea(args.db)
+    print(f"instantánea: {carpeta} ({time.perf_counter() - inicio:.1f} s si se exportó ahora)\n")
+
+    print(f"{'lectura':<22}{'SQLite ms':>12}{'Arrow ms':>12}")
+    for nombre, query, params in LECTURAS:
+        tiempos = {}
+        for motor, leer in (("sqlite", lambda: consultar(query, params, args.db)),
+                            ("arrow", lambda: instantanea.LECTURAS[query](carpeta, *params))):
+            leer()   # calienta la caché de páginas y el mapa
+            muestras = []
+            for _ in range(args.repeticiones):
+                t = time.perf_counter()
+                leer()
+                muestras.append((time.perf_counter() - t) * 1000)
+            tiempos[motor] = statistics.median(muestras)
+        print(f"{nombre:<22}{tiempos['sqlite']:>12.1f}{tiempos['arrow']:>12.1f}")
+
+    print(f"\n{'proceso nuevo':<22}{'ms':>10}{'pico MB':>10}{'privada MB':>12}{'archivo MB':>12}")
+    for modo in ("sqlite_movimientos", "arrow_movimientos", "sqlite_cxc", "arrow_cxc"):
+        r = _en_proceso_nuevo(modo, args.db)
+        print(f"{modo:<22}{r['ms']:>10.1f}{r['VmHWM']:>10.0f}{r['RssAnon']:>12.0f}{r['RssFile']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de contabilidad.db sintéticas con el mismo esquema que la base real
+Reproduce todas las tablas (caja2020–2025, cxc/cxp por año, socios20xx, er2023, edr2024/2025...)
+con socios sesgados (Zipf), estacionalidad mensual y fechas nulas ocasionales.
+Uso: python benchmarks/generador.py --filas 1000000 --salida /tmp/contabilidad_1m.db
+"""
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+# ==============================================================
+# ESQUEMA (idéntico al de contabilidad.db)
+# ==============================================================
+
+ESQUEMA = {
+    "bancos2022": '"concepto" TEXT, "valor" INTEGER',
+    "caja2020": '"fecha" TEXT, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "caja2022": '"fecha" TIMESTAMP, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "caja2023": '"fecha" TIMESTAMP, "codigo" INTEGER, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "caja2024": '"socio" INTEGER, "fecha" TIMESTAMP, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "caja2025": '"codigo_cliente" REAL, "fecha" TIMESTAMP, "categoria" TEXT, "detalle" TEXT, "prestamo" INTEGER, "abono" INTEGER, "saldo" INTEGER',
+    "cxc2020": '"socio" TEXT, "valor" INTEGER',
+    "cxc2024": '"socio" INTEGER, "fecha" TIMESTAMP, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "cxc2025": '"codigo_cliente" INTEGER, "fecha" TIMESTAMP, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "cxp2022": '"codigo" INTEGER, "socio" TEXT, "valor" INTEGER, "fecha" TIMESTAMP, "comentario" TEXT',
+    "cxp2023": '"fecha" TIMESTAMP, "codigo" INTEGER, "detalle" TEXT, "movimiento" INTEGER, "saldo" INTEGER',
+    "cxp2024": '"socio" INTEGER, "fecha" TIMESTAMP, "detalle" TEXT, "entrada " INTEGER, "salida" INTEGER, "saldo" INTEGER',
+    "cxp2025": '"codigo_cliente" INTEGER, "fecha" TIMESTAMP, "detalle" TEXT, "prestamo" INTEGER, "abono" INTEGER, "saldo" INTEGER',
+    "declaracion_renta2020": '"fecha" TEXT, "cuentas por cobrar" TEXT, "cedula de ciudadania" REAL, "valor" INTEGER',
+    "edr2024": '"fecha" TIMESTAMP, "detalle" TEXT, "saldo" INTEGER',
+    "edr2025": '"fecha" TIMESTAMP, "categoria" TEXT, "detalle" TEXT, "entrada" INTEGER, "salida" INTEGER',
+    "er2023": '"fecha" TIMESTAMP, "codigo" INTEGER, "detalle" TEXT, "ingreso" INTEGER, "egreso" INTEGER, "saldo" INTEGER',
+    "socios2020": '"nombre" TEXT, "fecha" TIMESTAMP, "detalle" TEXT, "saldo" INTEGER',
+    "socios2022": '"codigo" INTEGER, "socio" TEXT',
+    "socios2023": '"codigo" INTEGER, "nombre" TEXT',
+    "socios2024": '"codigo" INTEGER, "nombre" TEXT',
+}
+
+# Participación de cada tabla de movimientos en el total de filas
+PESOS = {
+    "caja2020": 0.08, "caja2022": 0.08, "caja2023": 0.10, "caja2024": 0.14, "caja2025": 0.16,
+    "cxc2024": 0.07, "cxc2025": 0.07,
+    "cxp2023": 0.04, "cxp2024": 0.05, "cxp2025": 0.05,
+    "er2023": 0.06, "edr2025": 0.10,
+}
+
+# Peso relativo de cada mes (más movimiento al inicio y al cierre del año)
+ESTACIONALIDAD = np.array([1.6, 1.4, 1.0, 1.0, 0.9, 0.8, 0.8, 0.8, 0.9, 1.0, 1.1, 1.5])
+
+CATEGORIAS = np.array(["gastos operacionales", "insumos", "aportes asociados", "cuenta por cobrar",
+                       "ingresos operacionales", "muebles maquinaria y equipo"])
+NOMBRES = np.array(["maria", "amanda", "amparo", "luz mary", "yamile", "alberto", "gloria", "felipe",
+                    "nidia", "santiago", "sergio", "julieth", "ruben", "german", "omar", "uriel"])
+APELLIDOS = np.array(["horta", "murillas", "cano", "saenz", "vera", "panesso", "aya", "arenas",
+                      "madrid", "maldonado", "lopez", "borja", "chivata", "torres", "mejia", "granada"])
+
+LOTE = 100_000
+
+# ==============================================================
+# GENERACIÓN VECTORIZADA
+# ==============================================================
+
+def _nombres_socios(n: int, rng) -> np.ndarray:
+    base = np.char.add(np.char.add(rng.choice(NOMBRES, n), " "), rng.choice(APELLIDOS, n))
+    return np.char.add(base, np.char.add(" ", np.arange(1, n + 1).astype(str)))
+
+
+def _fechas(anio: int, n: int, rng, nulas: float = 0.01) -> np.ndarray:
+    """Fechas 'AAAA-MM-DD 00:00:00' con estacionalidad mensual; una fracción queda en None."""
+    meses = rng.choice(12, n, p=ESTACIONALIDAD / ESTACIONALIDAD.sum())
+    inicio_mes = np.array([np.datetime64(f"{anio}-{m + 1:02d}-01") for m in range(12)])
+    dias_mes = np.array([28, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    dias = inicio_mes[meses] + rng.integers(0, dias_mes[meses]).astype("timedelta64[D]")
+    texto = np.char.add(dias.astype(str), " 00:00:00").astype(object)
+    texto[rng.random(n) < nulas] = None
+    return texto
+
+
+def _socios(n: int, n_socios: int, rng, vacios: float = 0.0) -> np.ndarray:
+    """Códigos de socio con sesgo Zipf (pocos socios concentran la mayoría de movimientos)."""
+    codigos = np.minimum(rng.zipf(1.4, n), n_socios).astype(object)
+    if vacios:
+        codigos[rng.random(n) < vacios] = None
+    return codigos
+
+
+def _detalles(n: int, rng, conceptos: int) -> np.ndarray:
+    tipo = rng.choice(np.array(["factura fe", "recibo de caja ", "comprobante egreso ", "rbo de caja "]), n)
+    proveedor = np.minimum(rng.zipf(1.2, n), conceptos)
+    return np.char.add(np.char.add(tipo, proveedor.astype(str)), " proveedor").astype(object)
+
+
+def _montos(n: int, rng) -> np.ndarray:
+    return (np.round(rng.lognormal(11.5, 1.2, n), -2)).astype(np.int64)
+
+
+def _lote_movimientos(tabla: str, anio: int, n: int, n_socios: int, conceptos: int, rng, saldo_inicial: int):
+    """Filas de una tabla de movimientos en el orden de columnas de ESQUEMA, y el saldo final."""
+    fechas = _fechas(anio, n, rng)
+    detalle = _detalles(n, rng, conceptos)
+    monto = _montos(n, rng)
+    es_debito = rng.random(n) < 0.4
+    debit = np.where(es_debito, monto, 0)
+    credit = np.where(es_debito, 0, monto)
+    saldo = saldo_inicial + np.cumsum(debit - credit)
+    final = int(saldo[-1]) if n else saldo_inicial
+
+    if tabla == "caja2020":
+        fechas = np.array([f"{f[8:10]}/{f[5:7]}/{f[:4]}" if f else None for f in fechas], dtype=object)
+        columnas = (fechas, detalle, debit, credit, saldo)
+    elif tabla == "caja2022":
+        columnas = (fechas, detalle, debit, credit, saldo)
+    elif tabla in ("caja2023", "er2023"):
+        columnas = (fechas, _socios(n, n_socios, rng, vacios=0.7), detalle, debit, credit, saldo)
+    elif tabla in ("caja2024", "cxc2024", "cxp2024"):
+        columnas = (_socios(n, n_socios, rng), fechas, detalle, debit, credit, saldo)
+    elif tabla == "caja2025":
+        codigo = _socios(n, n_socios, rng, vacios=0.8)
+        codigo = np.array([float(c) if c is not None else None for c in codigo], dtype=object)
+        columnas = (codigo, fechas, rng.choice(CATEGORIAS, n).astype(object), detalle, debit, credit, saldo)
+    elif tabla in ("cxc2025", "cxp2025"):
+        columnas = (_socios(n, n_socios, rng), fechas, detalle, debit, credit, saldo)
+    elif tabla == "cxp2023":
+        columnas = (fechas, _socios(n, n_socios, rng), detalle, debit - credit, saldo)
+    elif tabla == "edr2025":
+        columnas = (fechas, rng.choice(CATEGORIAS, n).astype(object), detalle, debit, credit)
+    else:
+        raise ValueError(tabla)
+    return list(zip(*(c.tolist() if hasattr(c, "tolist") else c for c in columnas))), final
+
+
+def generar(salida: str, filas: int, socios: int = None, conceptos: int = None, semilla: int = 42) -> dict:
+    """Crea la base en `salida` con ~`filas` movimientos. Devuelve filas por tabla."""
+    rng = np.random.default_rng(semilla)
+    socios = socios or int(min(50_000, max(50, filas // 2_000)))
+    conceptos = conceptos or int(min(200_000, max(200, filas // 50)))
+
+    ruta = Path(salida)
+    ruta.unlink(missing_ok=True)
+    conn = sqlite3.connect(ruta)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    for tabla, columnas in ESQUEMA.items():
+        conn.execute(f'CREATE TABLE "{tabla}" ({columnas})')
+
+    nombres = _nombres_socios(socios, rng)
+    codigos = np.arange(1, socios + 1)
+    with conn:
+        conn.executemany('INSERT INTO socios2022 VALUES (?, ?)', zip(codigos.tolist(), nombres.tolist()))
+        conn.executemany('INSERT INTO socios2023 VALUES (?, ?)', zip(codigos.tolist(), nombres.tolist()))
+        conn.executemany('INSERT INTO socios2024 VALUES (?, ?)', zip(codigos.tolist(), nombres.tolist()))
+        conn.executemany('INSERT INTO socios2020 VALUES (?, ?, ?, ?)',
+                         ((n, "2020-02-24 00:00:00", "aportes", int(v))
+                          for n, v in zip(nombres[:200].tolist(), _montos(min(200, socios), rng))))
+        conn.executemany('INSERT INTO cxc2020 VALUES (?, ?)',
+                         zip(nombres[:200].tolist(), _montos(min(200, socios), rng).tolist()))
+        conn.executemany('INSERT INTO cxp2022 VALUES (?, ?, ?, ?, ?)',
+                         ((int(c), n, int(v), "2022-07-31 00:00:00", "vienen")
+                          for c, n, v in zip(codigos[:50], nombres[:50].tolist(), _montos(min(50, socios), rng))))
+        conn.executemany('INSERT INTO edr2024 VALUES (?, ?, ?)',
+                         [("2024-12-31 00:00:00", d, int(v)) for d, v in zip(("ingreso", "gastos", "utilidad"), _montos(3, rng))])
+        conn.execute("INSERT INTO bancos2022 VALUES ('saldo bancos', 213707)")
+        conn.executemany('INSERT INTO declaracion_renta2020 VALUES (?, ?, ?, ?)',
+                         (("31/12/2020", n, float(1_000_000 + i), int(v))
+                          for i, (n, v) in enumerate(zip(nombres[:20].tolist(), _montos(min(20, socios), rng)))))
+
+    conteo = {}
+    for tabla, peso in PESOS.items():
+        total = max(1, int(filas * peso))
+        anio = int(tabla[-4:])
+        marcadores = ", ".join("?" * len(ESQUEMA[tabla].split(", ")))
+        saldo = 0
+        with conn:
+            for inicio in range(0, total, LOTE):
+                lote, saldo = _lote_movimientos(tabla, anio, min(LOTE, total - inicio), socios, conceptos, rng, saldo)
+                conn.executemany(f'INSERT INTO "{tabla}" VALUES ({marcadores})', lote)
+        conteo[tabla] = total
+    conn.close()
+    return conteo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera una contabilidad.db sintética con el esquema real.")
+    parser.add_argument("--filas", type=int, default=100_000, help="Movimientos totales (10k a 50M)")
+    parser.add_argument("--salida", required=True)
+    parser.add_argument("--socios", type=int, default=None)
+    parser.add_argument("--conceptos", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    conteo = generar(args.salida, args.filas, args.socios, args.conceptos, args.semilla)
+    print(f"{sum(conteo.values())} movimientos en {time.perf_counter() - inicio:.1f} s -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
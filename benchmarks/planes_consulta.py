@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+EXPLAIN QUERY PLAN de las consultas CXC por socio, antes y después de las claves tipadas
+Muestra los planes y comprueba que las consultas actuales busquen por los índices esperados;
+sale con código 1 si alguna recorre la tabla (p. ej. porque se perdió un índice).
+Uso: python benchmarks/planes_consulta.py [--db contabilidad.db]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conexion import explicar  # noqa: E402
+from cxc import CONSULTA_CXC, parametros_cxc  # noqa: E402
+from etl import asegurar_modelo  # noqa: E402
+from identidad import CONSULTA_MOVIMIENTOS_SOCIO  # noqa: E402
+
+# (nombre, sql, parámetros): solo se muestran, como referencia
+CONSULTAS_ANTES = (
+    ("total por socio (TRIM/CAST sobre cxc2025)", """
+        SELECT COALESCE(s.nombre, 'Socio no identificado') AS socio,
+               ROUND(SUM(CAST(c.salida AS FLOAT)), 2) AS total_ingreso
+        FROM socios2024 s
+        LEFT JOIN cxc2025 c ON TRIM(s.codigo) = TRIM(c.codigo_cliente)
+        WHERE CAST(c.salida AS FLOAT) > 0
+        GROUP BY s.nombre
+        ORDER BY total_ingreso DESC
+    """, ()),
+    ("serie de un socio (TRIM/CAST sobre cxc2025)", """
+        SELECT fecha, ROUND(CAST(salida AS FLOAT), 2) AS ingreso
+        FROM cxc2025
+        WHERE TRIM(codigo_cliente) = ?
+          AND CAST(salida AS FLOAT) > 0
+        ORDER BY fecha
+    """, ("9",)),
+)
+
+# (nombre, sql, parámetros, líneas que el plan debe contener)
+CONSULTAS_DESPUES = (
+    ("total por socio (socios + movimientos)", """
+        SELECT s.socio_id, ROUND(SUM(m.credit), 2) AS total_ingreso
+        FROM socios s
+        JOIN movimientos m
+            ON m.socio_id = s.socio_id
+           AND m.source = 'cxc' AND m.year = ?
+        WHERE s.year = ?
+          AND m.credit > 0
+        GROUP BY s.socio_id
+        ORDER BY total_ingreso DESC
+    """, (2025, 2024), ("SEARCH m USING COVERING INDEX ix_movimientos_cuenta_socio",
+                        "SEARCH s USING PRIMARY KEY")),
+    ("serie de un socio (movimientos)", """
+        SELECT fecha, ROUND(credit, 2) AS ingreso
+        FROM movimientos
+        WHERE source = 'cxc' AND year = ?
+          AND socio_id = ?
+          AND credit > 0
+        ORDER BY fecha
+    """, (2025, 9), ("SEARCH movimientos USING COVERING INDEX ix_movimientos_cuenta_socio",)),
+    ("CONSULTA_CXC del tablero", CONSULTA_CXC, parametros_cxc(2025),
+     ("SEARCH m USING COVERING INDEX ix_movimientos_cuenta_socio", "SEARCH socios USING PRIMARY KEY")),
+    ("historia de un socio (identidad.py)", CONSULTA_MOVIMIENTOS_SOCIO, (1,),
+     ("SEARCH movimientos USING INDEX ix_movimientos_socio_fecha",)),
+)
+
+
+def faltantes(lineas: list, esperado: tuple) -> list:
+    """Fragmentos esperados que no aparecen en ninguna línea del plan."""
+    return [e for e in esperado if not any(e in linea for linea in lineas)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="contabilidad.db")
+    args = parser.parse_args()
+
+    asegurar_modelo(args.db)
+    print("== ANTES ==")
+    for nombre, sql, params in CONSULTAS_ANTES:
+        print(f"-- {nombre}")
+        print("\n".join(explicar(sql, params, args.db)))
+
+    print("\n== DESPUÉS ==")
+    errores = []
+    for nombre, sql, params, esperado in CONSULTAS_DESPUES:
+        lineas = explicar(sql, params, args.db)
+        print(f"-- {nombre}")
+        print("\n".join(lineas))
+        errores += [(nombre, e) for e in faltantes(lineas, esperado)]
+
+    if errores:
+        print(f"\n{len(errores)} planes sin el índice esperado:")
+        for nombre, esperado in errores:
+            print(f"   {nombre}: falta {esperado!r}")
+        raise SystemExit(1)
+    print("\nplanes con los índices esperados")
+
+
+if __name__ == "__main__":
+    main()
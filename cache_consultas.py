@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de consultas con invalidación por versión de datos y desalojo LRU
+La clave es (consulta normalizada, parámetros, versión de contabilidad.db).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Presupuesto de memoria de la caché; se puede cambiar con la variable de entorno QQA_CACHE_MB.
+PRESUPUESTO_MB = int(os.environ.get("QQA_CACHE_MB", "256"))
+
+# ==============================================================
+# VERSIÓN DE DATOS
+# ==============================================================
+
+def version_datos(db_path: str) -> tuple:
+    """Firma barata del contenido: (dispositivo, inodo, mtime_ns, tamaño) de la base y de su WAL.
+
+    El inodo distingue una base reemplazada (copia nueva u os.replace) aunque conserve fecha y tamaño.
+    """
+    firma = []
+    for ruta in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(ruta)
+        except FileNotFoundError:
+            continue
+        firma.append((st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(firma)
+
+
+def normalizar_consulta(query: str) -> str:
+    """Colapsa espacios y saltos de línea para que la indentación no cambie la clave."""
+    return " ".join(query.split())
+
+# ==============================================================
+# CACHÉ LRU CON PRESUPUESTO DE MEMORIA
+# ==============================================================
+
+class CacheConsultas:
+    """Caché LRU de DataFrames limitada por bytes, con contadores de aciertos, fallos y desalojos."""
+
+    def __init__(self, presupuesto_bytes: int = PRESUPUESTO_MB * 1024 * 1024):
+        self.presupuesto_bytes = presupuesto_bytes
+        self._entradas = OrderedDict()   # clave -> (DataFrame, bytes)
+        self._bytes = 0
+        self._versiones = {}             # db_path -> última versión vista
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, query: str, params: tuple, db_path: str, cargar) -> pd.DataFrame:
+        """Devuelve una copia del resultado en caché o lo calcula con `cargar()` y lo guarda."""
+        version = version_datos(db_path)
+        clave = (db_path, normalizar_consulta(query), tuple(params), version)
+        with self._candado:
+            if self._versiones.get(db_path, version) != version:
+                self._descartar_version_anterior(db_path, version)
+            self._versiones[db_path] = version
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[0].copy()
+            self.fallos += 1
+
+        df = cargar()
+        tamano = int(df.memory_usage(index=True, deep=True).sum())
+        with self._candado:
+            if tamano <= self.presupuesto_bytes and clave not in self._entradas:
+                self._entradas[clave] = (df, tamano)
+                self._bytes += tamano
+                self._desalojar()
+        return df.copy()
+
+    def _descartar_version_anterior(self, db_path: str, version: tuple) -> None:
+        """Los datos cambiaron: las entradas de versiones anteriores ya no pueden acertar."""
+        for clave in [c for c in self._entradas if c[0] == db_path and c[3] != version]:
+            _, tamano = self._entradas.pop(clave)
+            self._bytes -= tamano
+            self.desalojos += 1
+
+    def _desalojar(self) -> None:
+        while self._bytes > self.presupuesto_bytes and self._entradas:
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes -= tamano
+            self.desalojos += 1
+
+    def limpiar(self) -> None:
+        with self._candado:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self._candado:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "presupuesto_bytes": self.presupuesto_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+            }
+
+
+# Instancia del proceso: sobrevive a los reruns de Streamlit porque el módulo queda importado.
+cache = CacheConsultas()
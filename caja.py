@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Consultas de Caja mensual sobre el cubo diario
+"""
+
+# Años con movimientos de caja, del más reciente al más antiguo.
+CONSULTA_ANIOS_CAJA = "SELECT DISTINCT year FROM movimientos WHERE source = 'caja' ORDER BY year DESC;"
+
+# Totales mensuales de un año (parámetro: year). Los movimientos sin fecha quedan con mes NULL.
+CONSULTA_CAJA_MENSUAL = """
+    SELECT 
+        NULLIF(month,'') AS mes,
+        ROUND(SUM(debit),2) AS total_ingresos,
+        ROUND(SUM(credit),2) AS total_egresos
+    FROM cubo_diario
+    WHERE source = 'caja' AND year = ?
+    GROUP BY month
+    ORDER BY month;
+"""
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Conciliación de saldos corridos de caja*, cxc*, cxp* y er*
+Recalcula el saldo de cada fila como apertura + entradas - salidas acumuladas (en el orden de
+la tabla original) y lo compara con el `saldo` registrado. Caja y estado de resultados llevan
+un saldo por tabla; las cuentas por cobrar y por pagar, uno por socio. La apertura de un año
+es el último saldo registrado del año anterior; sin año anterior, la que implica la primera
+fila con saldo. Todo se calcula con sumas acumuladas de NumPy, sin recorrer filas en Python.
+Uso: python conciliacion.py [--db contabilidad.db] [--todos] [--csv conciliacion.csv]
+"""
+
+import argparse
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache_consultas import version_datos
+from conexion import DB_PATH, abrir_conexion, consultar
+from etl import COLUMNAS_CREDIT, COLUMNAS_DEBIT, COLUMNAS_SALDO, PATRON_FUENTE, VERSION_MODELO
+import instantanea
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Diferencia (en pesos) a partir de la cual un saldo no cuadra
+TOLERANCIA = 1.0
+
+# Tablas con saldo corrido y cómo se agrupa: por tabla o por socio
+POR_TABLA = ("caja", "er")
+POR_SOCIO = ("cxc", "cxp")
+
+_COLUMNAS = ("id", "source", "year", "fila", "socio_id", "debit", "credit", "saldo")
+
+_resultados = {}              # (db, firma de versión) -> resumen
+_candado = threading.Lock()
+
+# ==============================================================
+# TABLAS CON SALDO CORRIDO
+# ==============================================================
+
+def tablas_con_saldo(db_path: str = DB_PATH) -> list:
+    """[(source, year)] de las tablas que registran movimientos y un saldo junto a ellos.
+
+    Quedan fuera las que solo guardan un valor por socio (cxc2020, cxp2022) o solo
+    totales (edr2024), porque ahí no hay un saldo corrido que recalcular.
+    """
+    conn = abrir_conexion(db_path)
+    try:
+        nombres = [n for (n,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        tablas = []
+        for nombre in nombres:
+            m = PATRON_FUENTE.match(nombre)
+            if not m or m.group(1) not in POR_TABLA + POR_SOCIO:
+                continue
+            columnas = {c.strip().lower() for _, c, *_ in conn.execute(f'PRAGMA table_info("{nombre}")')}
+            movimientos = "movimiento" in columnas or (
+                columnas & set(COLUMNAS_DEBIT) and columnas & set(COLUMNAS_CREDIT))
+            if movimientos and columnas & set(COLUMNAS_SALDO):
+                tablas.append((m.group(1), int(m.group(2))))
+        return sorted(tablas)
+    finally:
+        conn.close()
+
+
+def _cargar(db_path: str, tablas: list) -> pd.DataFrame:
+    """Columnas numéricas de `movimientos` de esas tablas (desde la instantánea si ya está exportada)."""
+    carpeta = instantanea.carpeta_vigente(db_path) if instantanea.disponible() else None
+    df = None
+    if carpeta is not None:
+        pc = instantanea.pc
+        try:
+            tabla = instantanea.tabla(carpeta, "movimientos").select(list(_COLUMNAS))
+            fuentes = sorted({s for s, _ in tablas})
+            df = tabla.filter(pc.is_in(tabla["source"], value_set=instantanea.pa.array(fuentes))).to_pandas()
+        except instantanea.errores_lectura():
+            instantanea.olvidar(carpeta)
+    if df is None:
+        marcadores = ", ".join("?" * len(POR_TABLA + POR_SOCIO))
+        df = consultar(f"SELECT {', '.join(_COLUMNAS)} FROM movimientos WHERE source IN ({marcadores})",
+                       POR_TABLA + POR_SOCIO, db_path)
+    claves = pd.MultiIndex.from_frame(df[["source", "year"]])
+    return df[claves.isin(tablas)]
+
+# ==============================================================
+# RECÁLCULO VECTORIZADO
+# ==============================================================
+
+def _inicios(grupo: np.ndarray) -> np.ndarray:
+    """Posición de la primera fila de cada grupo en un arreglo ordenado por grupo."""
+    return np.r_[0, np.flatnonzero(np.diff(grupo)) + 1] if len(grupo) else np.zeros(0, dtype=int)
+
+
+def acumulado_por_grupo(grupo: np.ndarray, delta: np.ndarray) -> np.ndarray:
+    """Suma acumulada de `delta` que se reinicia en cada grupo (filas ordenadas por grupo)."""
+    acumulado = np.cumsum(delta)
+    inicios = _inicios(grupo)
+    largos = np.diff(np.r_[inicios, len(grupo)])
+    return acumulado - np.repeat(acumulado[inicios] - delta[inicios], largos)
+
+
+def recalcular(grupo: np.ndarray, debit: np.ndarray, credit: np.ndarray, saldo: np.ndarray,
+               apertura: np.ndarray, tolerancia: float = TOLERANCIA) -> dict:
+    """Saldo calculado, diferencia y rupturas de cada fila (ordenadas por grupo y fila).
+
+    `apertura[g]` es el saldo con el que abre el grupo g. Una ruptura es una fila cuyo saldo
+    no se explica por el saldo registrado de la fila anterior y su propio movimiento: marca
+    dónde está el error, mientras que la diferencia acumulada arrastra todo lo anterior.
+    """
+    delta = debit - credit
+    calculado = apertura[grupo] + acumulado_por_grupo(grupo, delta)
+    diferencia = saldo - calculado
+    anterior = np.r_[np.nan, saldo[:-1]]
+    inicios = _inicios(grupo)
+    anterior[inicios] = apertura[grupo[inicios]]
+    with np.errstate(invalid="ignore"):
+        ruptura = np.abs(saldo - anterior - delta) > tolerancia
+        divergente = np.abs(diferencia) > tolerancia
+    return {"calculado": calculado, "diferencia": diferencia, "divergente": divergente, "ruptura": ruptura}
+
+
+def _aperturas(grupos: pd.DataFrame, implicita: np.ndarray, cierre: np.ndarray) -> tuple:
+    """Apertura de cada grupo: el cierre registrado del mismo grupo el año anterior, si existe."""
+    anterior = pd.Series(cierre, index=pd.MultiIndex.from_arrays(
+        [grupos["source"], grupos["socio_id"], grupos["year"] + 1]))
+    anterior = anterior[anterior.notna() & ~anterior.index.duplicated()]
+    heredada = anterior.reindex(pd.MultiIndex.from_frame(grupos[["source", "socio_id", "year"]])).to_numpy()
+    usa_anterior = ~np.isnan(heredada)
+    apertura = np.where(usa_anterior, heredada, np.nan_to_num(implicita))
+    origen = np.where(usa_anterior, "año anterior", np.where(np.isnan(implicita), "sin saldo", "primera fila"))
+    return apertura, origen
+
+
+def conciliar(db_path: str = DB_PATH, tolerancia: float = TOLERANCIA) -> pd.DataFrame:
+    """Resumen por tabla (caja, er) o por tabla y socio (cxc, cxp), con la primera fila que no cuadra."""
+    tablas = tablas_con_saldo(db_path)
+    df = _cargar(db_path, tablas)
+    df = df.assign(socio_id=np.where(df["source"].isin(POR_SOCIO), df["socio_id"].fillna(0), 0).astype("int64"))
+
+    codigo_fuente, _ = pd.factorize(df["source"], sort=True)
+    orden = np.lexsort((df["fila"].to_numpy(), df["socio_id"].to_numpy(), df["year"].to_numpy(), codigo_fuente))
+    df = df.iloc[orden].reset_index(drop=True)
+    codigo_fuente = codigo_fuente[orden]
+    year, socio = df["year"].to_numpy(), df["socio_id"].to_numpy()
+    nuevo = np.r_[True, (np.diff(codigo_fuente) != 0) | (np.diff(year) != 0) | (np.diff(socio) != 0)] if len(df) else np.zeros(0, bool)
+    grupo = np.cumsum(nuevo) - 1
+    inicios = np.flatnonzero(nuevo)
+
+    debit, credit = df["debit"].to_numpy(float), df["credit"].to_numpy(float)
+    saldo = df["saldo"].to_numpy(float)
+    grupos = df.loc[inicios, ["source", "year", "socio_id"]].reset_index(drop=True)
+
+    # Apertura implícita: primer saldo registrado menos lo acumulado hasta esa fila
+    acumulado = acumulado_por_grupo(grupo, debit - credit)
+    con_saldo = ~np.isnan(saldo)
+    implicita = pd.Series(saldo - acumulado)[con_saldo].groupby(grupo[con_saldo]).first()
+    cierre = pd.Series(saldo)[con_saldo].groupby(grupo[con_saldo]).last()
+    implicita = implicita.reindex(range(len(grupos))).to_numpy()
+    cierre = cierre.reindex(range(len(grupos))).to_numpy()
+    apertura, origen = _aperturas(grupos, implicita, cierre)
+
+    r = recalcular(grupo, debit, credit, saldo, apertura, tolerancia)
+    primera = pd.Series(np.arange(len(df)))[r["divergente"]].groupby(grupo[r["divergente"]]).first()
+    primera = primera.reindex(range(len(grupos)))
+    fin = np.r_[inicios[1:], len(df)] - 1 if len(df) else np.zeros(0, int)
+    posicion = primera.fillna(0).to_numpy(int)
+
+    resumen = grupos.assign(
+        tabla=grupos["source"] + grupos["year"].astype(str),
+        filas=np.diff(np.r_[inicios, len(df)]),
+        apertura=apertura,
+        origen_apertura=origen,
+        cierre_registrado=cierre,
+        cierre_calculado=r["calculado"][fin] if len(df) else [],
+        rupturas=np.bincount(grupo, weights=r["ruptura"], minlength=len(grupos)).astype(int),
+        filas_divergentes=np.bincount(grupo, weights=r["divergente"], minlength=len(grupos)).astype(int),
+        primera_fila=np.where(primera.notna(), df["fila"].to_numpy()[posicion], np.nan) if len(df) else [],
+        id_primera=np.where(primera.notna(), df["id"].to_numpy()[posicion], np.nan) if len(df) else [],
+        diferencia_primera=np.where(primera.notna(), r["diferencia"][posicion], np.nan) if len(df) else [],
+    )
+    resumen["estado"] = np.where(resumen["origen_apertura"] == "sin saldo", "sin saldo",
+                                 np.where(resumen["filas_divergentes"] > 0, "descuadre", "cuadra"))
+    resumen["primera_fila"] = resumen["primera_fila"].astype("Int64")
+    resumen = resumen.drop(columns="source").rename(columns={"socio_id": "socio"})
+    return _con_detalle_primera(resumen, db_path)
+
+
+def _con_detalle_primera(resumen: pd.DataFrame, db_path: str) -> pd.DataFrame:
+    """Agrega fecha y detalle de la primera fila divergente de cada grupo (una consulta por id)."""
+    ids = resumen["id_primera"].dropna().astype(int).tolist()
+    detalles = pd.DataFrame(columns=["id", "fecha_primera", "detalle_primera"])
+    if ids:
+        partes = [consultar(f"SELECT id, fecha AS fecha_primera, detalle AS detalle_primera FROM movimientos "
+                            f"WHERE id IN ({', '.join('?' * len(lote))})", tuple(lote), db_path)
+                  for lote in (ids[i:i + 500] for i in range(0, len(ids), 500))]
+        detalles = pd.concat(partes, ignore_index=True)
+    resumen = resumen.merge(detalles, how="left", left_on="id_primera", right_on="id").drop(columns=["id", "id_primera"])
+    return resumen[["tabla", "year", "socio", "filas", "estado", "apertura", "origen_apertura",
+                    "cierre_registrado", "cierre_calculado", "filas_divergentes", "rupturas",
+                    "primera_fila", "fecha_primera", "detalle_primera", "diferencia_primera"]]
+
+# ==============================================================
+# CACHÉ POR VERSIÓN Y DETALLE DE UN GRUPO
+# ==============================================================
+
+def resumen(db_path: str = DB_PATH) -> pd.DataFrame:
+    """`conciliar` con caché del proceso: se recalcula solo cuando cambian los datos."""
+    clave = (str(Path(db_path).resolve()), VERSION_MODELO, version_datos(db_path))
+    with _candado:
+        guardado = _resultados.get(clave)
+    if guardado is None:
+        guardado = conciliar(db_path)
+        with _candado:
+            _resultados.clear()
+            _resultados[clave] = guardado
+    return guardado.copy()
+
+
+def consulta_grupo(fila_resumen: pd.Series) -> tuple:
+    """(consulta, parámetros) con las filas de un grupo del resumen, en el orden de su tabla."""
+    source, year = fila_resumen["tabla"][:-4], int(fila_resumen["year"])
+    filtro, params = "source = ? AND year = ?", (source, year)
+    if source in POR_SOCIO:
+        filtro += " AND COALESCE(socio_id, 0) = ?"
+        params += (int(fila_resumen["socio"]),)
+    return f"SELECT fila, fecha, detalle, debit, credit, saldo FROM movimientos WHERE {filtro} ORDER BY fila", params
+
+
+def detalle_grupo(df_grupo: pd.DataFrame, apertura: float) -> pd.DataFrame:
+    """Filas de un grupo (de `consulta_grupo`) con el saldo calculado, la diferencia y las rupturas."""
+    r = recalcular(np.zeros(len(df_grupo), dtype=int), df_grupo["debit"].to_numpy(float),
+                   df_grupo["credit"].to_numpy(float), df_grupo["saldo"].to_numpy(float),
+                   np.array([apertura], dtype=float))
+    return df_grupo.assign(saldo_calculado=r["calculado"], diferencia=r["diferencia"], ruptura=r["ruptura"])
+
+# ==============================================================
+# REPORTE EN CONSOLA
+# ==============================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concilia los saldos registrados con los movimientos.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--todos", action="store_true", help="Lista también los grupos que cuadran")
+    parser.add_argument("--csv", default=None, help="Guarda el resumen completo en este CSV")
+    args = parser.parse_args()
+
+    tabla = conciliar(args.db)
+    if args.csv:
+        tabla.to_csv(args.csv, index=False)
+    conteo = tabla["estado"].value_counts()
+    print(f"{len(tabla)} grupos · " + " · ".join(f"{estado}: {n}" for estado, n in conteo.items()))
+    mostrar = tabla if args.todos else tabla[tabla["estado"] == "descuadre"]
+    columnas = ["tabla", "socio", "filas", "origen_apertura", "filas_divergentes", "rupturas",
+                "primera_fila", "fecha_primera", "diferencia_primera", "detalle_primera"]
+    with pd.option_context("display.width", 200, "display.max_rows", 500, "display.max_colwidth", 40):
+        print(mostrar[columnas].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
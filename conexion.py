@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Capa de conexión de solo lectura a contabilidad.db
+Una conexión compartida por proceso (o una propia por hilo trabajador del coordinador de
+consultas), con pragmas ajustados y sentencias preparadas en caché.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+DB_PATH = "contabilidad.db"
+
+# Número de sentencias compiladas que sqlite3 guarda por conexión.
+# Como las consultas usan parámetros, el texto SQL es constante y se reutiliza.
+SENTENCIAS_EN_CACHE = 256
+
+PRAGMAS_LECTURA = (
+    "PRAGMA query_only = ON",
+    "PRAGMA mmap_size = 268435456",   # 256 MB mapeados en memoria
+    "PRAGMA cache_size = -65536",     # 64 MB de caché de páginas
+    "PRAGMA temp_store = MEMORY",
+)
+
+_conexiones = {}                   # ruta resuelta -> (identidad del archivo, conexión)
+_candado = threading.Lock()
+_candado_ejecucion = threading.Lock()
+_hilo = threading.local()          # conexiones propias de los hilos que las reservaron
+
+# ==============================================================
+# CONEXIÓN COMPARTIDA
+# ==============================================================
+
+def abrir_conexion(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Abre una conexión nueva de solo lectura (URI mode=ro) con los pragmas de lectura."""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        check_same_thread=False,
+        cached_statements=SENTENCIAS_EN_CACHE,
+    )
+    for pragma in PRAGMAS_LECTURA:
+        conn.execute(pragma)
+    return conn
+
+
+def identidad_archivo(db_path: str):
+    """(st_dev, st_ino) del archivo; cambia cuando la base se reemplaza (copia nueva u os.replace)."""
+    try:
+        st = Path(db_path).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _vigente(conexiones: dict, db_path: str) -> sqlite3.Connection:
+    """Conexión de `conexiones` para `db_path`; se reabre si el archivo ya no es el que abrió.
+
+    Una conexión abierta sigue leyendo el archivo original aunque se haya borrado o reemplazado.
+    """
+    clave = str(Path(db_path).resolve())
+    identidad = identidad_archivo(db_path)
+    abierta = conexiones.get(clave)
+    if abierta is not None and abierta[0] == identidad:
+        return abierta[1]
+    if abierta is not None:
+        abierta[1].close()
+    conn = abrir_conexion(db_path)
+    conexiones[clave] = (identidad, conn)
+    return conn
+
+
+def obtener_conexion(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Devuelve la conexión del proceso para `db_path`, creándola la primera vez.
+
+    Se pide con `_candado_ejecucion` tomado: si hay que reabrirla, nadie está usando la anterior.
+    """
+    with _candado:
+        return _vigente(_conexiones, db_path)
+
+
+def reservar_conexiones_del_hilo() -> None:
+    """A partir de aquí, `consultar` en este hilo usa conexiones propias, sin el candado compartido.
+
+    Se llama al iniciar cada hilo del pool del coordinador de consultas; así las consultas
+    distintas corren en paralelo (SQLite admite varios lectores) en lugar de hacer fila.
+    """
+    _hilo.conexiones = {}
+
+
+def _conexion_del_hilo(db_path: str):
+    """Conexión propia del hilo actual para `db_path`, o None si el hilo no las reservó."""
+    propias = getattr(_hilo, "conexiones", None)
+    if propias is None:
+        return None
+    return _vigente(propias, db_path)
+
+
+def cerrar_conexiones() -> None:
+    """Cierra todas las conexiones abiertas por el proceso."""
+    with _candado:
+        for _, conn in _conexiones.values():
+            conn.close()
+        _conexiones.clear()
+
+# ==============================================================
+# EJECUCIÓN DE CONSULTAS
+# ==============================================================
+
+def consultar(query: str, params: tuple = (), db_path: str = DB_PATH) -> pd.DataFrame:
+    """Ejecuta `query` con parámetros enlazados sobre la conexión del hilo o la compartida."""
+    conn = _conexion_del_hilo(db_path)
+    if conn is not None:
+        return pd.read_sql_query(query, conn, params=params)
+    # La conexión se comparte entre los hilos de Streamlit: un cursor a la vez.
+    with _candado_ejecucion:
+        return pd.read_sql_query(query, obtener_conexion(db_path), params=params)
+
+
+def explicar(query: str, params: tuple = (), db_path: str = DB_PATH) -> list:
+    """Líneas de EXPLAIN QUERY PLAN de `query`, indentadas según el árbol del plan."""
+    with _candado_ejecucion:
+        filas = obtener_conexion(db_path).execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+    nivel = {0: -1}
+    lineas = []
+    for id_, padre, _, detalle in filas:
+        nivel[id_] = nivel.get(padre, -1) + 1
+        lineas.append("  " * nivel[id_] + detalle)
+    return lineas
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Coordinador de consultas del proceso: una sola ejecución por consulta en curso
+Cuando varias sesiones del tablero piden a la vez la misma consulta (por ejemplo, justo
+después de una actualización de datos, con la caché vacía), la primera la ejecuta y las
+demás esperan ese mismo resultado. Las consultas distintas corren en un pool acotado de
+hilos, cada uno con su conexión de solo lectura; si el pool y su cola están llenos, quien
+llega espera un cupo y, pasado el límite, recibe CoordinadorSaturado.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from cache_consultas import normalizar_consulta, version_datos
+from conexion import DB_PATH, reservar_conexiones_del_hilo
+from instantanea import leer
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Hilos (y conexiones) que ejecutan consultas en paralelo; variable de entorno QQA_HILOS.
+HILOS = int(os.environ.get("QQA_HILOS", "4"))
+
+# Consultas distintas que pueden esperar turno además de las que corren (QQA_COLA).
+COLA = int(os.environ.get("QQA_COLA", "16"))
+
+# Segundos que se espera un cupo antes de rechazar la consulta (QQA_ESPERA_S).
+ESPERA_S = float(os.environ.get("QQA_ESPERA_S", "30"))
+
+# ==============================================================
+# COORDINADOR
+# ==============================================================
+
+class CoordinadorSaturado(RuntimeError):
+    """El pool y su cola siguieron llenos durante todo el tiempo de espera."""
+
+
+class Coordinador:
+    """Ejecución única por clave (single-flight) sobre un pool acotado de hilos."""
+
+    def __init__(self, hilos: int = HILOS, cola: int = COLA, espera_s: float = ESPERA_S):
+        self.hilos = hilos
+        self.espera_s = espera_s
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="qqa-consulta",
+                                        initializer=reservar_conexiones_del_hilo)
+        self._cupos = threading.BoundedSemaphore(hilos + cola)
+        self._en_curso = {}              # clave -> Future de la ejecución que todos esperan
+        self._candado = threading.Lock()
+        self.ejecuciones = 0
+        self.compartidas = 0
+        self.rechazadas = 0
+
+    def ejecutar(self, clave, funcion, *args):
+        """Resultado de `funcion(*args)`, compartiendo la ejecución con quien pida la misma clave."""
+        with self._candado:
+            futuro = self._en_curso.get(clave)
+            if futuro is not None:
+                self.compartidas += 1
+        if futuro is not None:
+            return futuro.result()   # fuera del candado: `_terminar` lo necesita para liberar
+
+        if not self._cupos.acquire(timeout=self.espera_s):
+            with self._candado:
+                self.rechazadas += 1
+            raise CoordinadorSaturado(
+                f"{self.hilos} consultas en curso y la cola llena durante {self.espera_s:g} s; intenta de nuevo")
+
+        with self._candado:
+            # Mientras se esperaba el cupo, otra sesión pudo haber lanzado la misma consulta
+            futuro = self._en_curso.get(clave)
+            if futuro is not None:
+                self.compartidas += 1
+                self._cupos.release()
+                nuevo = False
+            else:
+                try:
+                    futuro = self._pool.submit(funcion, *args)
+                except BaseException:
+                    # Sin futuro no hay `_terminar` que devuelva el cupo (p. ej. pool ya cerrado)
+                    self._cupos.release()
+                    raise
+                self._en_curso[clave] = futuro
+                self.ejecuciones += 1
+                nuevo = True
+        if nuevo:
+            # Fuera del candado: si ya terminó, la función corre aquí mismo y lo toma
+            futuro.add_done_callback(lambda f: self._terminar(clave, f))
+        return futuro.result()
+
+    def _terminar(self, clave, futuro) -> None:
+        """Libera el cupo; el resultado (o el error) no se guarda: de eso se encarga la caché."""
+        with self._candado:
+            if self._en_curso.get(clave) is futuro:
+                del self._en_curso[clave]
+        self._cupos.release()
+
+    def estadisticas(self) -> dict:
+        with self._candado:
+            return {
+                "hilos": self.hilos,
+                "en_curso": len(self._en_curso),
+                "ejecuciones": self.ejecuciones,
+                "compartidas": self.compartidas,
+                "rechazadas": self.rechazadas,
+            }
+
+
+def clave_consulta(query: str, params: tuple = (), db_path: str = DB_PATH) -> tuple:
+    """Misma consulta, parámetros y versión de datos: misma ejecución."""
+    return (str(Path(db_path).resolve()), normalizar_consulta(query), tuple(params), version_datos(db_path))
+
+
+def leer_coordinado(query: str, params: tuple = (), db_path: str = DB_PATH,
+                    coordinador: "Coordinador" = None) -> pd.DataFrame:
+    """`instantanea.leer` a través del coordinador (el del proceso si no se indica otro)."""
+    coordinador = coordinador or coordinador_proceso
+    return coordinador.ejecutar(clave_consulta(query, params, db_path), leer, query, params, db_path)
+
+
+# Instancia del proceso: la comparten todas las sesiones de Streamlit.
+coordinador_proceso = Coordinador()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Cubo diario de movimientos — agregado precalculado para Caja mensual y Top 10 egresos
+Se mantiene con triggers sobre `movimientos`, sin reconstrucciones completas.
+Uso: python cubo.py [--db contabilidad.db]   (prueba los triggers y verifica el cubo contra los datos crudos)
+"""
+
+import argparse
+import sqlite3
+
+# ==============================================================
+# ESQUEMA Y TRIGGERS
+# ==============================================================
+
+# Las claves no admiten NULL para que el UPSERT detecte el conflicto:
+# sin fecha -> month = day = '', sin categoría/detalle -> '', sin socio -> 0.
+ESQUEMA_CUBO = """
+    CREATE TABLE cubo_diario (
+        source    TEXT    NOT NULL,
+        year      INTEGER NOT NULL,
+        month     TEXT    NOT NULL,
+        day       TEXT    NOT NULL,
+        categoria TEXT    NOT NULL,
+        detalle   TEXT    NOT NULL,
+        socio_id  INTEGER NOT NULL,
+        debit     REAL    NOT NULL,
+        credit    REAL    NOT NULL,
+        filas     INTEGER NOT NULL,
+        PRIMARY KEY (source, year, month, day, categoria, detalle, socio_id)
+    ) WITHOUT ROWID
+"""
+
+INDICES_CUBO = (
+    "CREATE INDEX ix_cubo_diario_source_day ON cubo_diario (source, day)",
+)
+
+_COLUMNAS_CLAVE = ("source", "year", "month", "day", "categoria", "detalle", "socio_id")
+_CLAVE = ", ".join(_COLUMNAS_CLAVE)
+
+
+def _expresiones_clave(fila: str) -> tuple:
+    """Expresiones de la clave del cubo para una fila de movimientos (NEW, OLD o m)."""
+    return (
+        f"{fila}.source",
+        f"{fila}.year",
+        f"COALESCE(substr({fila}.fecha,1,7),'')",
+        f"COALESCE({fila}.fecha,'')",
+        f"COALESCE({fila}.categoria,'')",
+        f"COALESCE({fila}.detalle,'')",
+        f"COALESCE({fila}.socio_id,0)",
+    )
+
+
+def _valores_clave(fila: str) -> str:
+    return ", ".join(_expresiones_clave(fila))
+
+
+def _sumar(fila: str) -> str:
+    return f"""
+        INSERT INTO cubo_diario ({_CLAVE}, debit, credit, filas)
+        VALUES ({_valores_clave(fila)}, {fila}.debit, {fila}.credit, 1)
+        ON CONFLICT ({_CLAVE}) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit,
+            filas = filas + 1;
+    """
+
+
+def _restar(fila: str) -> str:
+    condicion = f"({_CLAVE}) = ({_valores_clave(fila)})"
+    return f"""
+        UPDATE cubo_diario
+        SET debit = debit - {fila}.debit, credit = credit - {fila}.credit, filas = filas - 1
+        WHERE {condicion};
+        DELETE FROM cubo_diario WHERE {condicion} AND filas = 0;
+    """
+
+
+TRIGGERS_CUBO = (
+    f"CREATE TRIGGER tr_cubo_insert AFTER INSERT ON movimientos BEGIN {_sumar('NEW')} END",
+    f"CREATE TRIGGER tr_cubo_delete AFTER DELETE ON movimientos BEGIN {_restar('OLD')} END",
+    f"CREATE TRIGGER tr_cubo_update AFTER UPDATE ON movimientos BEGIN {_restar('OLD')} {_sumar('NEW')} END",
+)
+
+# ==============================================================
+# CONSTRUCCIÓN Y VERIFICACIÓN
+# ==============================================================
+
+_AGREGADO_CRUDO = f"""
+    SELECT {", ".join(f"{e} AS {c}" for e, c in zip(_expresiones_clave("m"), _COLUMNAS_CLAVE))},
+           SUM(m.debit) AS debit, SUM(m.credit) AS credit, COUNT(*) AS filas
+    FROM movimientos m
+    GROUP BY {_valores_clave("m")}
+"""
+
+
+def construir_cubo(conn: sqlite3.Connection) -> None:
+    """Carga el cubo desde `movimientos` e instala los triggers de mantenimiento incremental."""
+    conn.execute("DROP TABLE IF EXISTS cubo_diario")
+    conn.execute(ESQUEMA_CUBO)
+    conn.execute(f"INSERT INTO cubo_diario ({_CLAVE}, debit, credit, filas) {_AGREGADO_CRUDO}")
+    for indice in INDICES_CUBO:
+        conn.execute(indice)
+    for trigger in TRIGGERS_CUBO:
+        conn.execute(trigger)
+
+
+class CuboInconsistente(RuntimeError):
+    """cubo_diario no coincide con el agregado de `movimientos` (un trigger dejó de mantenerlo)."""
+
+
+def verificar_cubo(conn: sqlite3.Connection, source: str = None, year: int = None) -> list:
+    """Compara el cubo con el agregado crudo de `movimientos`; devuelve las filas que difieren.
+
+    Con `source` y `year` se compara solo esa cuenta (lo que toca una importación). El agregado
+    crudo se calcula una vez en una tabla temporal y cada grupo se busca en el cubo por su
+    clave primaria; las claves del cubo sin grupo crudo se buscan solo si sobran filas.
+    """
+    filtro, params = ("", ()) if source is None else ("WHERE source = ? AND year = ?", (source, year))
+    crudo = _AGREGADO_CRUDO.replace("FROM movimientos m", f"FROM movimientos m {filtro}")
+    coincide = " AND ".join(f"k.{c} = c.{c}" for c in _COLUMNAS_CLAVE)
+    clave_c = ", ".join(f"c.{c}" for c in _COLUMNAS_CLAVE)
+    clave_k = ", ".join(f"k.{c}" for c in _COLUMNAS_CLAVE)
+    conn.execute("DROP TABLE IF EXISTS temp.cubo_crudo")
+    conn.execute(f"CREATE TEMP TABLE cubo_crudo AS {crudo}", params)
+    try:
+        diferencias, sin_clave = [], 0
+        for fila in conn.execute(f"""
+            SELECT {clave_c}, ROUND(c.debit, 2), ROUND(c.credit, 2), c.filas,
+                   k.source IS NOT NULL, ROUND(k.debit, 2), ROUND(k.credit, 2), k.filas
+            FROM temp.cubo_crudo c
+            LEFT JOIN cubo_diario k ON {coincide}
+            WHERE k.source IS NULL
+               OR ROUND(k.debit, 2) <> ROUND(c.debit, 2) OR ROUND(k.credit, 2) <> ROUND(c.credit, 2)
+               OR k.filas <> c.filas
+        """):
+            clave, crudos, en_cubo = fila[:7], fila[7:10], fila[11:]
+            diferencias.append(("crudo", *clave, *crudos))
+            if fila[10]:
+                diferencias.append(("cubo", *clave, *en_cubo))
+            else:
+                sin_clave += 1
+        grupos = conn.execute("SELECT COUNT(*) FROM temp.cubo_crudo").fetchone()[0]
+        filas_cubo = conn.execute(f"SELECT COUNT(*) FROM cubo_diario {filtro}", params).fetchone()[0]
+        if filas_cubo > grupos - sin_clave:
+            diferencias += conn.execute(f"""
+                SELECT 'cubo', {clave_k}, ROUND(k.debit, 2), ROUND(k.credit, 2), k.filas
+                FROM cubo_diario k
+                {filtro.replace("source", "k.source").replace("year", "k.year")}
+                {"AND" if filtro else "WHERE"} NOT EXISTS (SELECT 1 FROM temp.cubo_crudo c WHERE {coincide})
+            """, params).fetchall()
+        return diferencias
+    finally:
+        conn.execute("DROP TABLE temp.cubo_crudo")
+
+
+def probar_triggers() -> list:
+    """Ejercita los triggers con INSERT, UPDATE y DELETE en una base en memoria; devuelve las diferencias.
+
+    Incluye claves con NULL (sin fecha, sin categoría, sin socio) y cambios de clave en los
+    UPDATE, que son los casos que un trigger mal escrito deja pasar sin error.
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("""
+            CREATE TABLE movimientos (
+                id INTEGER PRIMARY KEY, source TEXT, year INTEGER, fecha TEXT, categoria TEXT,
+                detalle TEXT, socio_id INTEGER, debit REAL, credit REAL
+            )
+        """)
+        filas = [
+            ("caja" if i % 2 else "cxc", 2024 + i % 2, None if i % 7 == 0 else f"2025-0{i % 3 + 1}-0{i % 2 + 1}",
+             None if i % 5 == 0 else "gasto", f"d{i % 4}", None if i % 6 == 0 else i % 3, float(i), float(i % 10))
+            for i in range(200)
+        ]
+        insertar = ("INSERT INTO movimientos (source, year, fecha, categoria, detalle, socio_id, debit, credit) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+        conn.executemany(insertar, filas[:100])
+        construir_cubo(conn)
+        conn.executemany(insertar, filas[100:])
+        conn.execute("UPDATE movimientos SET credit = credit + 1, detalle = 'otro' WHERE id % 3 = 0")
+        conn.execute("UPDATE movimientos SET fecha = NULL, socio_id = 7 WHERE id % 5 = 0")
+        conn.execute("DELETE FROM movimientos WHERE id % 4 = 0 OR detalle = 'd1'")
+        return verificar_cubo(conn)
+    finally:
+        conn.close()
+
+
+def exigir_cubo(conn: sqlite3.Connection, source: str = None, year: int = None) -> None:
+    """Lanza CuboInconsistente si el cubo (o esa cuenta) no coincide con `movimientos`."""
+    diferencias = verificar_cubo(conn, source, year)
+    if diferencias:
+        donde = "" if source is None else f" en {source}{year}"
+        raise CuboInconsistente(f"cubo_diario inconsistente{donde}: {len(diferencias)} claves difieren, "
+                                f"p. ej. {diferencias[:3]}")
+
+
+def exigir_triggers() -> None:
+    """Lanza CuboInconsistente si los triggers no mantienen bien el cubo (prueba en memoria)."""
+    diferencias = probar_triggers()
+    if diferencias:
+        raise CuboInconsistente(f"los triggers de cubo_diario no lo mantienen: {len(diferencias)} claves difieren, "
+                                f"p. ej. {diferencias[:3]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verifica que cubo_diario coincida con movimientos.")
+    parser.add_argument("--db", default="contabilidad.db")
+    args = parser.parse_args()
+    diferencias = probar_triggers()
+    if diferencias:
+        print(f"triggers de cubo_diario: {len(diferencias)} claves difieren en la prueba en memoria")
+        raise SystemExit(1)
+    conn = sqlite3.connect(args.db)
+    try:
+        diferencias = verificar_cubo(conn)
+    finally:
+        conn.close()
+    if diferencias:
+        print(f"cubo_diario inconsistente: {len(diferencias)} claves difieren")
+        for fila in diferencias[:20]:
+            print("  ", fila)
+        raise SystemExit(1)
+    print("cubo_diario consistente con movimientos")
+
+
+if __name__ == "__main__":
+    main()
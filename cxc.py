@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de Ingresos por socio (CXC) parametrizado por año
+Carga en una sola consulta los cobros del año junto con la dimensión de socios;
+los totales y la serie de cada socio se calculan en memoria con pandas.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================
+# CONFIGURACIÓN POR AÑO
+# ==============================================================
+
+# Para agregar un año basta con una entrada nueva. `socios` es el año de la tabla de socios
+# cuyos miembros se listan aunque no tengan cobros (2025 todavía no tiene socios2025 y usa
+# socios2024); los socios con cobros en el año se listan siempre.
+CXC_ANIOS = {
+    2025: {
+        "socios": 2024,
+        "descripcion": """
+    El análisis de los egresos durante 2025 muestra una concentración en determinados registros,
+    reflejando que las salidas de dinero se relacionan principalmente con pocas operaciones o beneficiarios.
+    En general, los egresos representan los compromisos financieros y pagos realizados por la asociación,
+    evidenciando una dinámica moderada y focalizada. Aunque el comportamiento global sugiere control en los desembolsos,
+    la baja dispersión de datos limita una lectura completa del flujo de pagos entre socios o proveedores,
+    lo que resalta la importancia de mantener actualizada la información para una interpretación más precisa del movimiento financiero.
+    """,
+        "nota": "En este caso, solo aparece información correspondiente a **Yamile Vera**, porque los demás socios no registran egresos en la base de datos CXP 2025 o sus datos no están correctamente asociados por nombre o código.",
+    },
+    2024: {
+        "socios": 2024,
+        "descripcion": """
+    El análisis de los ingresos por socio durante 2024 muestra una distribución más limitada en comparación con 2025.
+    En este año, algunos socios registraron actividad financiera moderada, mientras que otros no presentan movimientos en la base de datos.
+    El comportamiento evidencia posibles diferencias en la participación o registro contable entre ejercicios,
+    lo que puede deberse a cambios en la gestión, actualización de datos o la incorporación de nuevos socios.
+    """,
+        "nota": """
+    En este año, solo **Yamile Vera** registró ingresos por un total de **$3.500.000**,
+    lo que evidencia una concentración de los movimientos financieros en una sola socia.
+    Esto puede deberse a que los demás socios no realizaron operaciones durante 2024 o
+    a que sus datos no están correctamente asociados por nombre o código dentro del sistema contable.
+    """,
+    },
+    2023: {
+        "socios": 2023,
+        "descripcion": """
+    En 2023 no se dispone de una tabla específica de cuentas por cobrar (`cxc2023`) en la base de datos,
+    por lo tanto, no es posible mostrar los ingresos por socio de ese año.
+    Es posible que la información esté en la tabla `cxp2023` (cuentas por pagar) o que no se haya registrado.
+    """,
+        "nota": """
+    En este año no se registran datos de ingresos por socio,
+    posiblemente porque el sistema contable aún no tenía implementada la categoría de cuentas por cobrar (CXC).
+    """,
+    },
+}
+
+# ==============================================================
+# CARGA
+# ==============================================================
+
+# Una fila por socio sin cobros (ingreso NULL) o por cada cobro del socio en el año,
+# ordenadas por (socio_id, fecha) para que la serie de un socio sea un tramo contiguo.
+# Entran los socios de la tabla de socios del año y, aunque no figuren en ella, los que
+# tengan cobros; la unión es por el socio_id estable (identidad.py), sin comparar textos.
+CONSULTA_CXC = """
+    SELECT d.socio_id, d.nombre, m.fecha, m.credit AS ingreso
+    FROM socios_identidad d
+    LEFT JOIN movimientos m
+        ON m.socio_id = d.socio_id
+       AND m.source = 'cxc' AND m.year = ?
+       AND m.credit > 0
+    WHERE m.id IS NOT NULL
+       OR d.socio_id IN (SELECT socio_id FROM socios WHERE year = ?)
+    ORDER BY d.socio_id, m.fecha;
+"""
+
+
+def parametros_cxc(year: int) -> tuple:
+    """Parámetros de CONSULTA_CXC para `year` según CXC_ANIOS."""
+    return (year, CXC_ANIOS[year]["socios"])
+
+# ==============================================================
+# CÁLCULOS EN MEMORIA
+# ==============================================================
+
+def _etiquetas(df_cxc: pd.DataFrame) -> pd.Series:
+    """Nombre para mostrar por socio_id; si dos socios se llaman igual se agrega su id."""
+    socios = df_cxc.drop_duplicates("socio_id").set_index("socio_id")["nombre"].fillna("")
+    repetidos = socios.duplicated(keep=False)
+    return socios.where(~repetidos, socios + " (socio " + socios.index.astype(str) + ")")
+
+
+def lista_socios(df_cxc: pd.DataFrame) -> dict:
+    """{socio_id: nombre para mostrar}, ordenado por nombre."""
+    return _etiquetas(df_cxc).sort_values(kind="stable").to_dict()
+
+
+def hay_cobros(df_cxc: pd.DataFrame) -> bool:
+    return bool(df_cxc["ingreso"].notna().any())
+
+
+def totales_por_socio(df_cxc: pd.DataFrame) -> pd.DataFrame:
+    """Total cobrado por socio, de mayor a menor (columnas socio_id, socio, total_ingreso).
+
+    Se agrupa por socio_id: dos socios con el mismo nombre son dos filas; `socio` es solo la etiqueta.
+    """
+    cobros = df_cxc[df_cxc["ingreso"].notna()]
+    totales = cobros.groupby("socio_id", as_index=False)["ingreso"].sum().rename(columns={"ingreso": "total_ingreso"})
+    totales.insert(1, "socio", totales["socio_id"].map(_etiquetas(df_cxc)))
+    totales["total_ingreso"] = totales["total_ingreso"].round(2)
+    return totales.sort_values("total_ingreso", ascending=False, kind="stable", ignore_index=True)
+
+
+def serie_socio(df_cxc: pd.DataFrame, socio_id: int) -> pd.DataFrame:
+    """Cobros de un socio ordenados por fecha (columnas fecha, ingreso).
+
+    Como CONSULTA_CXC viene ordenada por socio_id, el socio se ubica con búsqueda binaria
+    y se toma su tramo sin recorrer el resto del DataFrame.
+    """
+    ids = df_cxc["socio_id"].to_numpy()
+    inicio = np.searchsorted(ids, socio_id, side="left")
+    fin = np.searchsorted(ids, socio_id, side="right")
+    tramo = df_cxc.iloc[inicio:fin]
+    cobros = tramo["ingreso"].notna().to_numpy()
+    return pd.DataFrame({
+        "fecha": pd.to_datetime(tramo["fecha"].to_numpy()[cobros]),
+        "ingreso": np.round(tramo["ingreso"].to_numpy()[cobros].astype(float), 2),
+    })
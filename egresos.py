@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Índice en memoria para Top 10 egresos en cualquier rango de fechas
+Sumas acumuladas diarias por concepto (todas las tablas caja*); el total de un concepto
+en un rango son dos búsquedas y el top-k sale de una selección parcial (argpartition).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================
+# CARGA
+# ==============================================================
+
+# Egresos diarios por concepto desde el cubo, ordenados por (concepto, día).
+CONSULTA_EGRESOS_DIARIOS = """
+    SELECT detalle, day, SUM(credit) AS credit, SUM(filas) AS filas
+    FROM cubo_diario
+    WHERE source = 'caja' AND day <> ''
+    GROUP BY detalle, day
+    ORDER BY detalle, day;
+"""
+
+# ==============================================================
+# ÍNDICE DE SUMAS ACUMULADAS
+# ==============================================================
+
+# La matriz densa guarda acumulados de egresos (float64) y de filas (int64): 16 bytes por
+# celda (días x conceptos), más un temporal float64 de 8 bytes por celda mientras se construye.
+BYTES_POR_CELDA_DENSA = 24
+
+# Presupuesto de memoria de la matriz densa; se puede cambiar con la variable de entorno QQA_EGRESOS_MB.
+# Por encima se usa la representación dispersa, que ocupa una celda por par (concepto, día).
+PRESUPUESTO_DENSO_MB = int(os.environ.get("QQA_EGRESOS_MB", "256"))
+MAX_CELDAS_DENSAS = PRESUPUESTO_DENSO_MB * 1024 * 1024 // BYTES_POR_CELDA_DENSA
+
+
+class IndiceEgresos:
+    """Sumas acumuladas de egresos por concepto sobre un eje de días.
+
+    Representación densa: una matriz (días + 1) x conceptos con los acumulados por fila,
+    de modo que el total de todos los conceptos en [a, b] es acumulado[b + 1] - acumulado[a]:
+    dos filas contiguas de memoria.
+
+    Representación dispersa (muchos conceptos x muchos días): cada par (concepto, día) se
+    codifica como concepto * ancho + día en un arreglo ordenado; una sola llamada a
+    searchsorted ubica los extremos del rango para todos los conceptos a la vez.
+    """
+
+    def __init__(self, df_diario: pd.DataFrame, max_celdas_densas: int = MAX_CELDAS_DENSAS):
+        conceptos, codigo_concepto = np.unique(df_diario["detalle"].fillna("").to_numpy(), return_inverse=True)
+        dias = pd.to_datetime(df_diario["day"]).to_numpy().astype("datetime64[D]")
+        credit = df_diario["credit"].to_numpy(dtype=float)
+        filas = df_diario["filas"].to_numpy(dtype=np.int64)
+
+        self.conceptos = conceptos
+        self.dia_inicial = dias.min() if len(dias) else np.datetime64("1970-01-01")
+        # Días 0..n-1 más una posición extra para el extremo abierto del rango
+        self._ancho = int((dias.max() - self.dia_inicial).astype(int)) + 2 if len(dias) else 1
+        dia = (dias - self.dia_inicial).astype(np.int64)
+        n = len(conceptos)
+
+        self.densa = self._ancho * n <= max_celdas_densas
+        if self.densa:
+            # Fila d + 1 acumula los días 0..d; la fila 0 queda en cero
+            celdas = (dia + 1) * n + codigo_concepto
+            tamano = self._ancho * n
+            # cumsum sobre el mismo arreglo: un solo temporal float64 además de lo que se guarda
+            self._acumulado = np.bincount(celdas, weights=credit, minlength=tamano).reshape(self._ancho, n)
+            np.cumsum(self._acumulado, axis=0, out=self._acumulado)
+            conteo = np.bincount(celdas, weights=filas, minlength=tamano).reshape(self._ancho, n)
+            np.cumsum(conteo, axis=0, out=conteo)
+            self._filas = conteo.astype(np.int64)
+            del conteo
+        else:
+            claves = codigo_concepto.astype(np.int64) * self._ancho + dia
+            orden = np.argsort(claves, kind="stable")
+            self._claves = claves[orden]
+            # Acumulados con un cero inicial: total(i, j) = acumulado[j] - acumulado[i]
+            self._acumulado = np.concatenate(([0.0], np.cumsum(credit[orden])))
+            self._filas = np.concatenate(([0], np.cumsum(filas[orden])))
+            self._base = np.arange(n, dtype=np.int64) * self._ancho
+
+    def _extremos(self, fecha_inicio, fecha_fin) -> tuple:
+        """Posiciones [a, b) sobre el eje de días, recortadas al rango del índice."""
+        a = (np.datetime64(fecha_inicio, "D") - self.dia_inicial).astype(np.int64)
+        b = (np.datetime64(fecha_fin, "D") - self.dia_inicial).astype(np.int64) + 1   # fecha_fin inclusiva
+        return int(np.clip(a, 0, self._ancho - 1)), int(np.clip(b, 0, self._ancho - 1))
+
+    def totales(self, fecha_inicio, fecha_fin) -> tuple:
+        """(total de egreso, número de registros) de cada concepto en el rango."""
+        a, b = self._extremos(fecha_inicio, fecha_fin)
+        if b <= a or not len(self.conceptos):
+            vacio = np.zeros(len(self.conceptos))
+            return vacio, vacio.astype(np.int64)
+        if self.densa:
+            return self._acumulado[b] - self._acumulado[a], self._filas[b] - self._filas[a]
+        inicio = np.searchsorted(self._claves, self._base + a, side="left")
+        fin = np.searchsorted(self._claves, self._base + b, side="left")
+        return self._acumulado[fin] - self._acumulado[inicio], self._filas[fin] - self._filas[inicio]
+
+    def top(self, fecha_inicio, fecha_fin, k: int = 10) -> pd.DataFrame:
+        """Los k conceptos con mayor egreso en [fecha_inicio, fecha_fin] (columnas concepto, total_egreso)."""
+        totales, filas = self.totales(fecha_inicio, fecha_fin)
+        candidatos = np.flatnonzero(filas > 0)
+        if len(candidatos) > k:
+            # k-ésimo mayor total; se conservan también los empates para desempatar por nombre
+            umbral = -np.partition(-totales[candidatos], k - 1)[k - 1]
+            candidatos = candidatos[totales[candidatos] >= umbral]
+        orden = np.lexsort((self.conceptos[candidatos], -totales[candidatos]))
+        candidatos = candidatos[orden][:k]
+        return pd.DataFrame({
+            "concepto": [c or None for c in self.conceptos[candidatos]],
+            "total_egreso": np.round(totales[candidatos], 2),
+        })
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+ETL de contabilidad.db — tabla de hechos `movimientos`, dimensión `socios` y cubo diario
+Normaliza las tablas por año (caja*, cxc*, cxp*, er*, edr*, socios*) en tablas tipadas; cada
+referencia a un socio (código o nombre) se resuelve al socio_id estable de identidad.py.
+Uso: python etl.py [--db contabilidad.db]
+"""
+
+import argparse
+import re
+import sqlite3
+
+import identidad
+from conexion import DB_PATH
+from cubo import construir_cubo, exigir_cubo, exigir_triggers
+
+# Se incrementa cada vez que cambia el esquema o los índices del modelo;
+# asegurar_modelo() reconstruye las bases con una versión anterior.
+VERSION_MODELO = 4
+
+# ==============================================================
+# ESQUEMA DE LA TABLA DE HECHOS
+# ==============================================================
+
+ESQUEMA_MOVIMIENTOS = """
+    CREATE TABLE movimientos (
+        id        INTEGER PRIMARY KEY,
+        year      INTEGER NOT NULL,
+        source    TEXT    NOT NULL,
+        fila      INTEGER NOT NULL,
+        fecha     TEXT,
+        socio_id  INTEGER,
+        categoria TEXT,
+        detalle   TEXT,
+        debit     REAL    NOT NULL DEFAULT 0,
+        credit    REAL    NOT NULL DEFAULT 0,
+        saldo     REAL
+    )
+"""
+
+INDICES_MOVIMIENTOS = (
+    "CREATE INDEX ix_movimientos_fecha ON movimientos (fecha)",
+    "CREATE INDEX ix_movimientos_socio_fecha ON movimientos (socio_id, fecha)",
+    "CREATE INDEX ix_movimientos_source_year ON movimientos (source, year)",
+    # Cubre el total por socio y la serie de un socio (source, year, socio_id) sin leer la tabla
+    "CREATE INDEX ix_movimientos_cuenta_socio ON movimientos (source, year, socio_id, fecha, credit)",
+)
+
+# Socios de cada tabla socios20xx, con el socio_id estable (codigo queda NULL en socios2020)
+ESQUEMA_SOCIOS = """
+    CREATE TABLE socios (
+        year     INTEGER NOT NULL,
+        socio_id INTEGER NOT NULL,
+        codigo   INTEGER,
+        nombre   TEXT    NOT NULL,
+        PRIMARY KEY (year, socio_id)
+    ) WITHOUT ROWID
+"""
+
+# Tablas fuente: prefijo + año (caja2025, cxc2024, er2023, edr2025...)
+PATRON_FUENTE = re.compile(r"^(caja|cxc|cxp|er|edr)(\d{4})$")
+PATRON_SOCIOS = re.compile(r"^socios(\d{4})$")
+
+# Columnas candidatas por rol, en orden de preferencia (nombres ya sin espacios).
+# debit aumenta el saldo de la tabla y credit lo disminuye.
+COLUMNAS_SOCIO = ("codigo_cliente", "codigo", "socio")
+COLUMNAS_DEBIT = ("entrada", "prestamo", "ingreso")
+COLUMNAS_CREDIT = ("salida", "abono", "egreso")
+COLUMNAS_DETALLE = ("detalle", "comentario")
+COLUMNAS_SALDO = ("saldo", "valor")
+COLUMNAS_NOMBRE = ("nombre", "socio")
+
+# ==============================================================
+# DESCUBRIMIENTO DE TABLAS Y COLUMNAS
+# ==============================================================
+
+def tablas_fuente(conn: sqlite3.Connection) -> list:
+    """Devuelve [(tabla, source, year)] para cada tabla anual del libro contable."""
+    filas = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()
+    fuentes = []
+    for (nombre,) in filas:
+        m = PATRON_FUENTE.match(nombre)
+        if m:
+            fuentes.append((nombre, m.group(1), int(m.group(2))))
+    return fuentes
+
+
+def tablas_socios(conn: sqlite3.Connection) -> list:
+    """Devuelve [(tabla, year)] para cada tabla socios20xx."""
+    filas = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()
+    return [(nombre, int(m.group(1))) for (nombre,) in filas if (m := PATRON_SOCIOS.match(nombre))]
+
+
+def _columnas(conn: sqlite3.Connection, tabla: str) -> dict:
+    """Mapea nombre limpio -> (nombre real, tipo declarado). Ej.: 'entrada' -> ('entrada ', 'INTEGER')."""
+    info = conn.execute(f'PRAGMA table_info("{tabla}")').fetchall()
+    return {nombre.strip().lower(): (nombre, (tipo or "").upper()) for _, nombre, tipo, *_ in info}
+
+
+def _primera(columnas: dict, candidatas: tuple):
+    for c in candidatas:
+        if c in columnas:
+            return columnas[c]
+    return None
+
+
+def _q(columna: str) -> str:
+    return '"' + columna.replace('"', '""') + '"'
+
+
+def _expr_fecha(col: str) -> str:
+    """Fecha ISO (AAAA-MM-DD); acepta TIMESTAMP y texto dd/mm/aaaa como en caja2020."""
+    return (
+        f"CASE WHEN {col} LIKE '__/__/____' "
+        f"THEN substr({col},7,4) || '-' || substr({col},4,2) || '-' || substr({col},1,2) "
+        f"ELSE date({col}) END"
+    )
+
+
+def columnas_socio(conn: sqlite3.Connection, tabla: str) -> tuple:
+    """(columna de código, columna de nombre) con que `tabla` identifica al socio; None si no tiene.
+
+    Un código es numérico aunque se guarde como REAL (caja2025); una columna de socio TEXT
+    (cxc2020) es un nombre.
+    """
+    cols = _columnas(conn, tabla)
+    codigo = next((cols[c][0] for c in COLUMNAS_SOCIO if c in cols and cols[c][1] != "TEXT"), None)
+    nombre = next((cols[c][0] for c in COLUMNAS_NOMBRE + COLUMNAS_SOCIO if c in cols and cols[c][1] == "TEXT"), None)
+    return codigo, nombre
+
+
+def registrar_socios(conn: sqlite3.Connection, identidades: identidad.Identidades, tabla: str,
+                     desde_fila: int = 0) -> None:
+    """Resuelve las referencias distintas a socios de `tabla` (filas con rowid > `desde_fila`)."""
+    codigo, nombre = columnas_socio(conn, tabla)
+    if codigo is None and nombre is None:
+        return
+    columnas = ", ".join(_q(c) if c else "NULL" for c in (codigo, nombre))
+    for valor_codigo, valor_nombre in conn.execute(
+            f"SELECT DISTINCT {columnas} FROM {_q(tabla)} WHERE rowid > ?", (desde_fila,)).fetchall():
+        identidades.resolver(valor_codigo, valor_nombre)
+
+
+def consulta_normalizacion(conn: sqlite3.Connection, tabla: str, source: str, year: int) -> str:
+    """Arma el SELECT que lleva `tabla` al esquema de `movimientos`."""
+    cols = _columnas(conn, tabla)
+
+    fecha = _expr_fecha(_q(cols["fecha"][0])) if "fecha" in cols else "NULL"
+    categoria = _q(cols["categoria"][0]) if "categoria" in cols else "NULL"
+
+    socio_id = "NULL"
+    detalle_socio = None
+    codigo_socio, nombre_socio = columnas_socio(conn, tabla)
+    if codigo_socio is not None:
+        socio_id = identidad.expresion_codigo(_q(codigo_socio))
+    elif nombre_socio is not None:
+        socio_id = identidad.expresion_nombre(_q(nombre_socio))
+        # cxc2020 identifica al socio por nombre: se conserva también como detalle
+        detalle_socio = _q(nombre_socio)
+
+    detalle = _primera(cols, COLUMNAS_DETALLE)
+    detalle = _q(detalle[0]) if detalle else (detalle_socio or "NULL")
+
+    if "movimiento" in cols:
+        mov = _q(cols["movimiento"][0])
+        debit = f"CASE WHEN {mov} > 0 THEN {mov} ELSE 0 END"
+        credit = f"CASE WHEN {mov} < 0 THEN -{mov} ELSE 0 END"
+    else:
+        d = _primera(cols, COLUMNAS_DEBIT)
+        c = _primera(cols, COLUMNAS_CREDIT)
+        debit = _q(d[0]) if d else "0"
+        credit = _q(c[0]) if c else "0"
+
+    saldo = _primera(cols, COLUMNAS_SALDO)
+    saldo = f"CAST({_q(saldo[0])} AS REAL)" if saldo else "NULL"
+
+    return f"""
+        SELECT {year}, '{source}', rowid, {fecha}, {socio_id},
+               {categoria}, {detalle},
+               CAST(COALESCE({debit}, 0) AS REAL),
+               CAST(COALESCE({credit}, 0) AS REAL),
+               {saldo}
+        FROM {_q(tabla)}
+    """
+
+
+# ==============================================================
+# CONSTRUCCIÓN
+# ==============================================================
+
+def _construir_movimientos(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TABLE IF EXISTS movimientos")
+    conn.execute(ESQUEMA_MOVIMIENTOS)
+    for tabla, source, year in tablas_fuente(conn):
+        conn.execute(
+            "INSERT INTO movimientos "
+            "(year, source, fila, fecha, socio_id, categoria, detalle, debit, credit, saldo) "
+            + consulta_normalizacion(conn, tabla, source, year)
+        )
+    for indice in INDICES_MOVIMIENTOS:
+        conn.execute(indice)
+
+
+def _construir_identidad(conn: sqlite3.Connection) -> identidad.Identidades:
+    """Resuelve todas las referencias a socios: primero las tablas de socios (de la más reciente
+    a la más antigua, para que el nombre visible sea el actual) y luego las de movimientos."""
+    identidad.preparar_conexion(conn)
+    identidades = identidad.Identidades(conn)
+    for tabla, _ in sorted(tablas_socios(conn), key=lambda t: -t[1]):
+        registrar_socios(conn, identidades, tabla)
+    for tabla, _, _ in tablas_fuente(conn):
+        registrar_socios(conn, identidades, tabla)
+    conn.execute("DELETE FROM socios_identidad")
+    identidades.guardar(conn)
+    return identidades
+
+
+def _construir_socios(conn: sqlite3.Connection, identidades: identidad.Identidades) -> None:
+    conn.execute("DROP TABLE IF EXISTS socios")
+    conn.execute(ESQUEMA_SOCIOS)
+    for tabla, year in tablas_socios(conn):
+        codigo, nombre = columnas_socio(conn, tabla)
+        if nombre is None:
+            continue
+        columnas = f"{_q(codigo) if codigo else 'NULL'}, {_q(nombre)}"
+        filas = conn.execute(f"SELECT {columnas} FROM {_q(tabla)}").fetchall()
+        conn.executemany(
+            "INSERT OR IGNORE INTO socios (year, socio_id, codigo, nombre) VALUES (?, ?, ?, ?)",
+            ((year, socio_id, int(identidad.clave_codigo(c)) if identidad.clave_codigo(c) else None, " ".join(n.split()))
+             for c, n in filas if (socio_id := identidades.resolver(c, n)) is not None),
+        )
+
+
+def construir_modelo(db_path: str = DB_PATH) -> int:
+    """Reconstruye `movimientos`, `socios` y `cubo_diario`. Devuelve el número de movimientos.
+
+    `claves_socios` no se reconstruye: se completa, para que los socio_id no cambien.
+    Antes se prueban los triggers del cubo en memoria: si no lo mantienen, no se construye nada.
+    """
+    exigir_triggers()
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            identidades = _construir_identidad(conn)
+            _construir_movimientos(conn)
+            _construir_socios(conn, identidades)
+            construir_cubo(conn)
+            conn.execute("ANALYZE")
+            conn.execute(f"PRAGMA user_version = {VERSION_MODELO}")
+        return conn.execute("SELECT COUNT(*) FROM movimientos").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def asegurar_modelo(db_path: str = DB_PATH) -> None:
+    """Construye el modelo solo si falta o fue creado con una versión anterior del esquema."""
+    conn = sqlite3.connect(db_path)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    if version < VERSION_MODELO:
+        construir_modelo(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Construye la tabla de hechos `movimientos` y la dimensión `socios`.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    filas = construir_modelo(args.db)
+    print(f"movimientos: {filas} filas")
+    conn = sqlite3.connect(args.db)
+    try:
+        exigir_cubo(conn)
+    finally:
+        conn.close()
+    print("cubo_diario consistente con movimientos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Figuras Plotly del tablero
+Las usan tanto Reto2.py como el generador de reportes por lotes.
+"""
+
+import pandas as pd
+import plotly.express as px
+
+from muestreo import MAX_BARRAS_SOCIOS, UMBRAL_WEBGL, agrupar_cola, puntos_para_ancho, reducir_serie
+
+
+def fig_caja_mensual(df_caja: pd.DataFrame, anio: int):
+    return px.bar(
+        df_caja,
+        x="mes",
+        y=["total_ingresos", "total_egresos"],
+        barmode="group",
+        title=f"Totales mensuales de ingresos y egresos — {anio}",
+        color_discrete_sequence=["#1f77b4", "#FFC107"]
+    )
+
+
+def fig_top_egresos(df_top10: pd.DataFrame, titulo: str = "Top 10 conceptos con mayores egresos"):
+    fig = px.bar(
+        df_top10,
+        x="total_egreso",
+        y="concepto",
+        orientation="h",
+        title=titulo,
+        text="total_egreso",
+        color="total_egreso",
+        color_continuous_scale="Reds"
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+    return fig
+
+
+def fig_totales_socios(df_all: pd.DataFrame, anio: int, max_barras: int = MAX_BARRAS_SOCIOS):
+    """Barras por socio; con más de `max_barras` socios la cola se suma en "Otros" (None: todos)."""
+    fig = px.bar(
+        agrupar_cola(df_all, "socio", "total_ingreso", max_barras),
+        x="socio",
+        y="total_ingreso",
+        text="total_ingreso",
+        title=f"Concentración de ingresos por socio — CXC {anio}",
+        color="total_ingreso",
+        color_continuous_scale="Blues"
+    )
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_layout(xaxis_title="Socio", yaxis_title="Total ingreso")
+    return fig
+
+
+def fig_serie_socio(df_socio: pd.DataFrame, socio: str, anio: int, ancho_px: int = None):
+    """Serie de cobros de un socio, submuestreada con LTTB para `ancho_px` píxeles y en WebGL si es larga.
+
+    `ancho_px` solo fija cuántos puntos se dibujan; el gráfico toma el ancho de su contenedor.
+    """
+    df_plot = reducir_serie(df_socio, "fecha", "ingreso", puntos_para_ancho(ancho_px))
+    titulo = f"Evolución de ingresos de {socio} — CXC {anio}"
+    if len(df_plot) < len(df_socio):
+        titulo += f" ({len(df_plot):,} de {len(df_socio):,} puntos)"
+    return px.line(
+        df_plot,
+        x="fecha",
+        y="ingreso",
+        markers=len(df_plot) <= UMBRAL_WEBGL,
+        render_mode="webgl" if len(df_plot) > UMBRAL_WEBGL else "svg",
+        title=titulo,
+        color_discrete_sequence=["#2ca02c"]
+    )
+
+
+def fig_conciliacion(df_detalle: pd.DataFrame, titulo: str, ancho_px: int = None):
+    """Saldo registrado contra saldo recalculado, fila a fila (cada serie submuestreada con LTTB para `ancho_px`)."""
+    puntos = puntos_para_ancho(ancho_px)
+    series = [
+        reducir_serie(df_detalle.dropna(subset=[columna]), "fila", columna, puntos)
+        .rename(columns={columna: "valor"}).assign(serie=etiqueta)
+        for columna, etiqueta in (("saldo", "Registrado"), ("saldo_calculado", "Calculado"))
+    ]
+    df_plot = pd.concat(series, ignore_index=True)
+    return px.line(
+        df_plot,
+        x="fila",
+        y="valor",
+        color="serie",
+        markers=len(df_plot) <= UMBRAL_WEBGL,
+        render_mode="webgl" if len(df_plot) > UMBRAL_WEBGL else "svg",
+        title=titulo,
+        color_discrete_sequence=["#1f77b4", "#d62728"]
+    )
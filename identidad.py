@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Identidad de socios entre años: un id entero estable por socio
+Cada año identifica a los socios a su manera (socios2020 solo por nombre, socios2022 por
+`codigo` y `socio`, cxc2024 por `socio`, cxc2025 por `codigo_cliente`, caja2025 con el
+código como REAL). Aquí cada referencia (código o nombre normalizado) se resuelve a un id
+y el mapeo se guarda en `claves_socios`, que no se borra al reconstruir el modelo: un socio
+conserva su id aunque cambien las reglas o lleguen años nuevos.
+Uso: python identidad.py [--db contabilidad.db] [--socio "yamile vera"]
+"""
+
+import argparse
+import re
+import sqlite3
+import unicodedata
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from conexion import DB_PATH, abrir_conexion
+
+# ==============================================================
+# ESQUEMA
+# ==============================================================
+
+# Mapeo persistente clave -> socio_id; la clave primaria es el índice de búsqueda
+ESQUEMA_CLAVES = """
+    CREATE TABLE IF NOT EXISTS claves_socios (
+        tipo     TEXT    NOT NULL,          -- 'codigo' o 'nombre'
+        clave    TEXT    NOT NULL,          -- código entero como texto o nombre normalizado
+        socio_id INTEGER NOT NULL,
+        PRIMARY KEY (tipo, clave)
+    ) WITHOUT ROWID
+"""
+
+# Dimensión: un nombre para mostrar por socio_id (el más reciente de las tablas de socios)
+ESQUEMA_IDENTIDAD = """
+    CREATE TABLE IF NOT EXISTS socios_identidad (
+        socio_id INTEGER PRIMARY KEY,
+        codigo   INTEGER,
+        nombre   TEXT NOT NULL
+    )
+"""
+
+# Nombres que aparecen en columnas de socio pero no son socios
+NO_SOCIOS = {"", "nn", "total", "totales"}
+
+# Prefijos que algunas tablas anteponen al nombre ("socios/amanda murillas")
+PREFIJOS = ("socios",)
+
+# Similitud mínima entre dos palabras para considerarlas la misma ("julieth" / "yulieth")
+SIMILITUD_PALABRA = 0.8
+
+# Historia de un socio en todos los años: una búsqueda en ix_movimientos_socio_fecha
+CONSULTA_MOVIMIENTOS_SOCIO = """
+    SELECT year, source, fecha, detalle, debit, credit, saldo
+    FROM movimientos
+    WHERE socio_id = ?
+    ORDER BY fecha;
+"""
+
+# ==============================================================
+# NORMALIZACIÓN DE CLAVES
+# ==============================================================
+
+def normalizar_nombre(nombre):
+    """Minúsculas, sin tildes, sin signos ni espacios repetidos y sin prefijos; None si no es un socio."""
+    if nombre is None:
+        return None
+    texto = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode().lower()
+    palabras = re.sub(r"[^a-z0-9]+", " ", texto).split()
+    while palabras and palabras[0] in PREFIJOS:
+        palabras = palabras[1:]
+    normalizado = " ".join(palabras)
+    return None if normalizado in NO_SOCIOS else normalizado
+
+
+def clave_codigo(valor):
+    """Código entero como texto ('9' para 9, 9.0, ' 9 ' o '9.0'); None para vacío, 0 o no numérico.
+
+    Coincide con CAST(CAST(valor AS INTEGER) AS TEXT) en SQLite, que es como se busca en SQL.
+    """
+    if valor is None:
+        return None
+    try:
+        codigo = int(float(str(valor).strip()))
+    except ValueError:
+        return None
+    return str(codigo) if codigo else None
+
+
+def expresion_codigo(columna: str) -> str:
+    """SQL que resuelve una columna de código a socio_id (una búsqueda por clave primaria)."""
+    return ("(SELECT socio_id FROM claves_socios WHERE tipo = 'codigo' "
+            f"AND clave = CAST(CAST({columna} AS INTEGER) AS TEXT))")
+
+
+def expresion_nombre(columna: str) -> str:
+    """SQL que resuelve una columna de nombre a socio_id; requiere `preparar_conexion`."""
+    return f"(SELECT socio_id FROM claves_socios WHERE tipo = 'nombre' AND clave = normalizar_nombre({columna}))"
+
+
+def preparar_conexion(conn: sqlite3.Connection) -> None:
+    """Crea las tablas de identidad si faltan y registra normalizar_nombre() como función SQL."""
+    conn.execute(ESQUEMA_CLAVES)
+    conn.execute(ESQUEMA_IDENTIDAD)
+    conn.create_function("normalizar_nombre", 1, normalizar_nombre, deterministic=True)
+
+# ==============================================================
+# RESOLUCIÓN
+# ==============================================================
+
+def _palabras_iguales(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if a.isdigit() or b.isdigit():
+        return False
+    if len(a) == 1 or len(b) == 1:          # inicial: "luis e granada" / "luis ernesto granada"
+        return a[0] == b[0]
+    return min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= SIMILITUD_PALABRA
+
+
+def _contenido(corto: list, largo: list) -> bool:
+    """Cada palabra de `corto` coincide, en orden, con una palabra distinta de `largo`."""
+    i = 0
+    for palabra in corto:
+        while i < len(largo) and not _palabras_iguales(palabra, largo[i]):
+            i += 1
+        if i == len(largo):
+            return False
+        i += 1
+    return True
+
+
+class Identidades:
+    """Mapeo clave -> socio_id en memoria (diccionarios), cargado de y guardado en `claves_socios`.
+
+    El código manda: dos códigos distintos son dos socios aunque se llamen parecido. Un nombre
+    sin código se asigna al socio con ese nombre normalizado o, si no hay, al único socio
+    cuyo nombre lo contiene palabra por palabra ("luz mary" -> "luz mary saenz"); si no hay
+    uno solo, es un socio nuevo.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.codigos, self.nombres = {}, {}
+        for tipo, clave, socio_id in conn.execute("SELECT tipo, clave, socio_id FROM claves_socios"):
+            (self.codigos if tipo == "codigo" else self.nombres)[clave] = socio_id
+        self.con_codigo = set(self.codigos.values())
+        self._por_palabra = {}                         # palabra -> {socio_id}: candidatos por parecido
+        self._alias = {}                               # socio_id -> [nombres normalizados]
+        for nombre, socio_id in self.nombres.items():
+            self._indexar(nombre, socio_id)
+        self.siguiente = max([*self.codigos.values(), *self.nombres.values(), 0]) + 1
+        self.nuevas = []                               # (tipo, clave, socio_id) por guardar
+        self.visibles = {}                             # socio_id -> (codigo, nombre) vistos en esta corrida
+
+    def _indexar(self, nombre: str, socio_id: int) -> None:
+        self._alias.setdefault(socio_id, []).append(nombre)
+        for palabra in nombre.split():
+            self._por_palabra.setdefault(palabra, set()).add(socio_id)
+
+    def _parecido(self, nombre: str, solo_sin_codigo: bool):
+        palabras = nombre.split()
+        candidatos = set().union(*(self._por_palabra.get(p, set()) for p in palabras))
+        if solo_sin_codigo:
+            candidatos -= self.con_codigo
+        coinciden = set()
+        for socio_id, alias in ((i, a) for i in candidatos for a in self._alias[i]):
+            otras = alias.split()
+            corto, largo = (palabras, otras) if len(palabras) <= len(otras) else (otras, palabras)
+            # Un nombre de una sola palabra solo vale si es exacto ("marcial" -> "marcial mutis")
+            if len(corto) == 1 and corto[0] not in largo:
+                continue
+            if _contenido(corto, largo):
+                coinciden.add(socio_id)
+        return coinciden.pop() if len(coinciden) == 1 else None
+
+    def _registrar(self, tipo: str, clave: str, socio_id: int) -> None:
+        destino = self.codigos if tipo == "codigo" else self.nombres
+        if clave not in destino:
+            destino[clave] = socio_id
+            self.nuevas.append((tipo, clave, socio_id))
+            if tipo == "codigo":
+                self.con_codigo.add(socio_id)
+            else:
+                self._indexar(clave, socio_id)
+
+    def resolver(self, codigo=None, nombre=None):
+        """socio_id de una referencia (código, nombre o ambos); None si no identifica a nadie."""
+        clave_c, clave_n = clave_codigo(codigo), normalizar_nombre(nombre)
+        if clave_c is None and clave_n is None:
+            return None
+        socio_id = self.codigos.get(clave_c) if clave_c else None
+        if socio_id is None and clave_n:
+            socio_id = self.nombres.get(clave_n)
+            if clave_c and socio_id in self.con_codigo:
+                socio_id = None                        # el nombre es de otro código
+            if socio_id is None:
+                socio_id = self._parecido(clave_n, solo_sin_codigo=clave_c is not None)
+        if socio_id is None:
+            socio_id = self.siguiente
+            self.siguiente += 1
+        if clave_c:
+            self._registrar("codigo", clave_c, socio_id)
+        if clave_n:
+            self._registrar("nombre", clave_n, socio_id)
+        # Para mostrar se queda el primer código y el primer nombre vistos (se leen primero los socios más recientes)
+        codigo_visible, nombre_visible = self.visibles.get(socio_id, (None, None))
+        self.visibles[socio_id] = (codigo_visible or (int(clave_c) if clave_c else None),
+                                   nombre_visible or (" ".join(str(nombre).split()) if clave_n else None))
+        return socio_id
+
+    def guardar(self, conn: sqlite3.Connection) -> int:
+        """Escribe las claves nuevas y da de alta en la dimensión a los socios nuevos."""
+        conn.executemany("INSERT OR IGNORE INTO claves_socios (tipo, clave, socio_id) VALUES (?, ?, ?)", self.nuevas)
+        conn.executemany(
+            "INSERT OR IGNORE INTO socios_identidad (socio_id, codigo, nombre) VALUES (?, ?, ?)",
+            ((socio_id, codigo, nombre or f"socio {codigo}") for socio_id, (codigo, nombre) in self.visibles.items()),
+        )
+        guardadas = len(self.nuevas)
+        self.nuevas = []
+        return guardadas
+
+# ==============================================================
+# CONSULTA EN CONSOLA
+# ==============================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Muestra la identidad de los socios o la historia de uno.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--socio", default=None, help="Nombre o código de un socio")
+    args = parser.parse_args()
+    from etl import asegurar_modelo     # etl importa este módulo
+    asegurar_modelo(args.db)
+    conn = abrir_conexion(args.db)
+    conn.create_function("normalizar_nombre", 1, normalizar_nombre, deterministic=True)
+    try:
+        if args.socio is None:
+            claves = pd.read_sql_query(
+                "SELECT d.socio_id, d.codigo, d.nombre, group_concat(c.clave, ' | ') AS nombres "
+                "FROM socios_identidad d LEFT JOIN claves_socios c ON c.socio_id = d.socio_id AND c.tipo = 'nombre' "
+                "GROUP BY d.socio_id ORDER BY d.socio_id", conn)
+            with pd.option_context("display.width", 200, "display.max_rows", 500, "display.max_colwidth", 80):
+                print(claves.to_string(index=False))
+            return
+        fila = conn.execute(
+            f"SELECT COALESCE({expresion_codigo('?')}, {expresion_nombre('?')})",
+            (args.socio, args.socio)).fetchone()
+        if fila[0] is None:
+            raise SystemExit(f"No se encontró el socio {args.socio!r}")
+        historia = pd.read_sql_query(CONSULTA_MOVIMIENTOS_SOCIO, conn, params=(fila[0],))
+        print(f"socio_id {fila[0]}: {len(historia)} movimientos en {historia['year'].nunique()} años")
+        with pd.option_context("display.width", 200, "display.max_rows", 500):
+            print(historia.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Importación por lotes de movimientos nuevos (CSV/XLSX) a contabilidad.db
+Lee el archivo en streaming, valida y convierte cada valor al tipo declarado de la tabla
+destino, descarta filas repetidas por huella de contenido y escribe con executemany en
+transacciones WAL por lote, de modo que el tablero sigue leyendo mientras se carga.
+Las filas nuevas pasan también a `movimientos` (y al cubo, por sus triggers).
+Uso: python importacion.py archivo.csv --tabla caja2025 [--db contabilidad.db] [--lote 20000]
+"""
+
+import argparse
+import csv
+import datetime as dt
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import identidad
+from conexion import DB_PATH
+from cubo import exigir_cubo
+from etl import PATRON_FUENTE, VERSION_MODELO, consulta_normalizacion, registrar_socios
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Filas por lote (y por transacción): la memoria no depende del tamaño del archivo.
+LOTE = 20_000
+
+# Huellas de las filas ya cargadas por tabla, para descartar repetidas entre importaciones.
+ESQUEMA_HUELLAS = """
+    CREATE TABLE IF NOT EXISTS importacion_huellas (
+        tabla  TEXT NOT NULL,
+        huella BLOB NOT NULL,
+        PRIMARY KEY (tabla, huella)
+    ) WITHOUT ROWID
+"""
+
+# Parámetros por consulta al buscar huellas existentes (por debajo del límite de SQLite).
+HUELLAS_POR_CONSULTA = 500
+
+FORMATOS_FECHA = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%Y/%m/%d")
+
+# ==============================================================
+# CONVERSIÓN DE TIPOS
+# ==============================================================
+
+class FilaInvalida(ValueError):
+    pass
+
+
+class ImportacionInvalida(ValueError):
+    """La tabla destino o las columnas del archivo no permiten importar."""
+
+
+def _vacio(valor) -> bool:
+    return valor is None or (isinstance(valor, str) and valor.strip() == "")
+
+
+def _entero(valor):
+    if isinstance(valor, bool):
+        raise FilaInvalida(f"no es un número: {valor!r}")
+    if isinstance(valor, int):
+        return valor
+    numero = _real(valor)
+    if not numero.is_integer():
+        raise FilaInvalida(f"se esperaba un entero: {valor!r}")
+    return int(numero)
+
+
+def _real(valor) -> float:
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    try:
+        return float(str(valor).strip().replace(" ", ""))
+    except ValueError:
+        raise FilaInvalida(f"no es un número: {valor!r}") from None
+
+
+def _marca_tiempo(valor) -> str:
+    """Fecha como la guardan las tablas TIMESTAMP: 'AAAA-MM-DD HH:MM:SS'."""
+    if isinstance(valor, dt.datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, dt.date):
+        return valor.strftime("%Y-%m-%d 00:00:00")
+    texto = str(valor).strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return dt.datetime.strptime(texto, formato).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    raise FilaInvalida(f"fecha no reconocida: {valor!r}")
+
+
+def _texto(valor) -> str:
+    if isinstance(valor, dt.datetime):
+        return valor.strftime("%d/%m/%Y")
+    return str(valor).strip()
+
+
+def convertidor(tipo: str):
+    """Función de conversión para un tipo declarado de SQLite (afinidad por nombre del tipo)."""
+    tipo = tipo.upper()
+    if "INT" in tipo:
+        return _entero
+    if "REAL" in tipo or "FLOA" in tipo or "DOUB" in tipo or "NUM" in tipo:
+        return _real
+    if "TIME" in tipo or "DATE" in tipo:
+        return _marca_tiempo
+    return _texto
+
+
+def convertir_fila(valores: tuple, convertidores: tuple) -> tuple:
+    return tuple(None if _vacio(v) else convertir(v) for v, convertir in zip(valores, convertidores))
+
+
+def huella_fila(fila: tuple) -> bytes:
+    """Huella del contenido ya convertido; 1 y 1.0 cuentan como el mismo valor."""
+    canonica = [float(v) if isinstance(v, (int, float)) else v for v in fila]
+    return hashlib.sha1(json.dumps(canonica, ensure_ascii=False).encode("utf-8")).digest()
+
+# ==============================================================
+# LECTURA DEL ARCHIVO EN STREAMING
+# ==============================================================
+
+def leer_archivo(ruta: Path):
+    """(encabezados, iterador de filas, cerrar) de un CSV o de la primera hoja de un XLSX."""
+    if ruta.suffix.lower() in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook   # solo se necesita para Excel
+        libro = load_workbook(ruta, read_only=True, data_only=True)
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        return [str(c or "") for c in next(filas)], filas, libro.close
+    archivo = open(ruta, newline="", encoding="utf-8-sig")
+    muestra = archivo.read(4096)
+    archivo.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(archivo, dialecto)
+    return next(lector), lector, archivo.close
+
+
+def _lotes(iterable, tamano: int):
+    lote = []
+    for elemento in iterable:
+        lote.append(elemento)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+# ==============================================================
+# ESCRITURA
+# ==============================================================
+
+def _columnas_destino(conn: sqlite3.Connection, tabla: str) -> list:
+    """[(nombre real, tipo declarado)] de la tabla destino, en orden."""
+    return [(nombre, tipo or "") for _, nombre, tipo, *_ in conn.execute(f'PRAGMA table_info("{tabla}")')]
+
+
+def _lista_columnas(columnas: list) -> str:
+    return ", ".join('"' + nombre.replace('"', '""') + '"' for nombre, _ in columnas)
+
+
+def _huellas_existentes(conn: sqlite3.Connection, tabla: str, huellas: list) -> set:
+    existentes = set()
+    for inicio in range(0, len(huellas), HUELLAS_POR_CONSULTA):
+        parte = huellas[inicio:inicio + HUELLAS_POR_CONSULTA]
+        marcas = ", ".join("?" * len(parte))
+        existentes.update(h for (h,) in conn.execute(
+            f"SELECT huella FROM importacion_huellas WHERE tabla = ? AND huella IN ({marcas})", (tabla, *parte)))
+    return existentes
+
+
+def _indexar_filas_previas(conn: sqlite3.Connection, tabla: str, columnas: list, lote: int) -> None:
+    """La primera vez que se importa a una tabla se registran las huellas de lo que ya tenía."""
+    if conn.execute("SELECT 1 FROM importacion_huellas WHERE tabla = ? LIMIT 1", (tabla,)).fetchone():
+        return
+    convertidores = tuple(convertidor(tipo) for _, tipo in columnas)
+    cursor = conn.execute(f'SELECT {_lista_columnas(columnas)} FROM "{tabla}"')
+    with conn:
+        while filas := cursor.fetchmany(lote):
+            huellas = []
+            for fila in filas:
+                try:
+                    huellas.append((tabla, huella_fila(convertir_fila(fila, convertidores))))
+                except FilaInvalida:
+                    continue
+            conn.executemany("INSERT OR IGNORE INTO importacion_huellas VALUES (?, ?)", huellas)
+
+
+def importar(ruta: str, tabla: str, db_path: str = DB_PATH, lote: int = LOTE, rechazos: str = None,
+             progreso=None) -> dict:
+    """Carga `ruta` en `tabla`; devuelve contadores y filas por segundo."""
+    if not PATRON_FUENTE.match(tabla):
+        raise ImportacionInvalida(f"{tabla} no es una tabla de movimientos (caja/cxc/cxp/er/edr + año)")
+    ruta = Path(ruta)
+    inicio = time.perf_counter()
+
+    conn = sqlite3.connect(db_path, isolation_level="DEFERRED")
+    conn.execute("PRAGMA journal_mode = WAL")      # los lectores no se bloquean durante la carga
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute(ESQUEMA_HUELLAS)
+
+    columnas = _columnas_destino(conn, tabla)
+    if not columnas:
+        conn.close()
+        raise ImportacionInvalida(f"No existe la tabla {tabla} en {db_path}")
+    encabezados, filas, cerrar = leer_archivo(ruta)
+    posiciones = {c.strip().lower(): i for i, c in enumerate(encabezados)}
+    desconocidas = set(posiciones) - {c.strip().lower() for c, _ in columnas}
+    if desconocidas:
+        cerrar()
+        conn.close()
+        raise ImportacionInvalida(f"Columnas que no existen en {tabla}: {', '.join(sorted(desconocidas))}")
+    # Posición de cada columna destino en el archivo (None: la columna falta y queda NULL)
+    origen = [posiciones.get(c.strip().lower()) for c, _ in columnas]
+    convertidores = tuple(convertidor(tipo) for _, tipo in columnas)
+
+    _indexar_filas_previas(conn, tabla, columnas, lote)
+    modelo = conn.execute("PRAGMA user_version").fetchone()[0] >= VERSION_MODELO
+    if modelo:
+        identidad.preparar_conexion(conn)
+        identidades = identidad.Identidades(conn)
+    m = PATRON_FUENTE.match(tabla)
+    hacia_movimientos = (
+        "INSERT INTO movimientos (year, source, fila, fecha, socio_id, categoria, detalle, debit, credit, saldo) "
+        + consulta_normalizacion(conn, tabla, m.group(1), int(m.group(2))) + " WHERE rowid > ?"
+    )
+    insertar = f'INSERT INTO "{tabla}" ({_lista_columnas(columnas)}) VALUES ({", ".join("?" * len(columnas))})'
+
+    salida_rechazos = None
+    contadores = {"leidas": 0, "insertadas": 0, "duplicadas": 0, "rechazadas": 0}
+    try:
+        for numero_lote, filas_lote in enumerate(_lotes(filas, lote)):
+            nuevas = {}
+            rechazadas = 0
+            for fila in filas_lote:
+                contadores["leidas"] += 1
+                valores = tuple(fila[i] if i is not None and i < len(fila) else None for i in origen)
+                try:
+                    convertida = convertir_fila(valores, convertidores)
+                except FilaInvalida as e:
+                    rechazadas += 1
+                    if salida_rechazos is None:
+                        archivo = open(rechazos or ruta.with_suffix(".rechazos.csv"), "w", newline="", encoding="utf-8")
+                        salida_rechazos = (archivo, csv.writer(archivo))
+                        salida_rechazos[1].writerow(["fila", "motivo", *encabezados])
+                    salida_rechazos[1].writerow([contadores["leidas"] + 1, str(e), *fila])   # +1: encabezado
+                    continue
+                nuevas.setdefault(huella_fila(convertida), convertida)
+
+            existentes = _huellas_existentes(conn, tabla, list(nuevas))
+            nuevas = {h: f for h, f in nuevas.items() if h not in existentes}
+            contadores["rechazadas"] += rechazadas
+            contadores["duplicadas"] += len(filas_lote) - rechazadas - len(nuevas)
+
+            # Una transacción por lote: los lectores ven lotes completos o nada
+            with conn:
+                ultimo = conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{tabla}"').fetchone()[0]
+                conn.executemany(insertar, nuevas.values())
+                conn.executemany("INSERT INTO importacion_huellas VALUES (?, ?)", ((tabla, h) for h in nuevas))
+                if modelo:
+                    # Socios nuevos del lote: reciben su socio_id antes de pasar a movimientos
+                    registrar_socios(conn, identidades, tabla, ultimo)
+                    identidades.guardar(conn)
+                    conn.execute(hacia_movimientos, (ultimo,))
+            contadores["insertadas"] += len(nuevas)
+            if progreso:
+                progreso(numero_lote, contadores, time.perf_counter() - inicio)
+        if modelo:
+            # Los triggers mantuvieron el cubo lote a lote: se compara la cuenta importada con sus movimientos
+            exigir_cubo(conn, m.group(1), int(m.group(2)))
+        # Pasa el WAL a la base y lo deja en cero; si hay lectores activos, se vacía en la próxima carga
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        if salida_rechazos is not None:
+            salida_rechazos[0].close()
+        cerrar()
+        conn.close()
+
+    segundos = time.perf_counter() - inicio
+    contadores["segundos"] = round(segundos, 2)
+    contadores["filas_por_segundo"] = round(contadores["leidas"] / segundos) if segundos else None
+    return contadores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa movimientos nuevos desde CSV o XLSX.")
+    parser.add_argument("archivo")
+    parser.add_argument("--tabla", required=True, help="Tabla destino, p. ej. caja2025")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--lote", type=int, default=LOTE)
+    parser.add_argument("--rechazos", default=None, help="CSV de filas rechazadas (por defecto, junto al archivo)")
+    args = parser.parse_args()
+
+    def progreso(_, c, segundos):
+        print(f"\r{c['leidas']:,} leídas · {c['insertadas']:,} nuevas · {c['leidas'] / segundos:,.0f} filas/s",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        resultado = importar(args.archivo, args.tabla, args.db, args.lote, args.rechazos, progreso)
+    except ImportacionInvalida as e:
+        raise SystemExit(str(e))
+    print(file=sys.stderr)
+    print(
+        f"{resultado['leidas']:,} filas leídas en {resultado['segundos']} s ({resultado['filas_por_segundo']:,} filas/s): "
+        f"{resultado['insertadas']:,} insertadas, {resultado['duplicadas']:,} duplicadas, "
+        f"{resultado['rechazadas']:,} rechazadas"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Instantánea columnar (Arrow IPC) de las tablas del modelo, mapeada en memoria
+Se exporta una vez por versión de contabilidad.db; las lecturas del tablero toman columnas
+del mapa sin copiarlas, y varios procesos del servidor comparten las mismas páginas del
+sistema operativo en lugar de tener cada uno su DataFrame.
+Requiere pyarrow (opcional): sin él, el tablero sigue consultando SQLite.
+Uso: python instantanea.py [--db contabilidad.db]   (exporta si hace falta y verifica contra SQL)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache_consultas import version_datos
+from caja import CONSULTA_CAJA_MENSUAL
+from conexion import DB_PATH, abrir_conexion, consultar
+from cxc import CONSULTA_CXC, CXC_ANIOS, parametros_cxc
+from egresos import CONSULTA_EGRESOS_DIARIOS
+from etl import VERSION_MODELO
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:   # dependencia opcional
+    pa = None
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Se incrementa cuando cambian los esquemas de abajo, para regenerar las instantáneas.
+VERSION_INSTANTANEA = 2
+
+# QQA_INSTANTANEA=0 desactiva las lecturas columnares (todo va a SQLite).
+ACTIVA = os.environ.get("QQA_INSTANTANEA", "1") == "1"
+
+# Filas por lote al exportar: la memoria de la exportación no crece con la tabla.
+LOTE = 100_000
+
+# Tablas exportadas y sus tipos Arrow (mismo orden de columnas que en SQLite)
+ESQUEMAS = {
+    "movimientos": (
+        ("id", "int64"), ("year", "int64"), ("source", "string"), ("fila", "int64"), ("fecha", "string"),
+        ("socio_id", "int64"), ("categoria", "string"), ("detalle", "string"),
+        ("debit", "float64"), ("credit", "float64"), ("saldo", "float64"),
+    ),
+    "socios": (("year", "int64"), ("socio_id", "int64"), ("codigo", "int64"), ("nombre", "string")),
+    "socios_identidad": (("socio_id", "int64"), ("codigo", "int64"), ("nombre", "string")),
+    "cubo_diario": (
+        ("source", "string"), ("year", "int64"), ("month", "string"), ("day", "string"),
+        ("categoria", "string"), ("detalle", "string"), ("socio_id", "int64"),
+        ("debit", "float64"), ("credit", "float64"), ("filas", "int64"),
+    ),
+}
+
+# Instantáneas anteriores que se conservan junto a la vigente: un lector que acaba de tomar
+# una carpeta la sigue encontrando aunque otro proceso termine de exportar la siguiente.
+CONSERVAR = 1
+
+# Veces que se intenta fijar un estado de la base que coincida con su firma antes de desistir.
+INTENTOS_FIRMA = 3
+
+_registro = logging.getLogger("qqa.instantanea")
+_abiertas = {}                # (carpeta, tabla) -> pa.Table mapeada en memoria
+_exportando = {}              # <db>.arrow -> hilo que exporta en segundo plano (uno por base)
+_candado = threading.Lock()
+
+# ==============================================================
+# EXPORTACIÓN
+# ==============================================================
+
+def disponible() -> bool:
+    return pa is not None and ACTIVA
+
+
+def _esquema(tabla: str):
+    return pa.schema([(nombre, getattr(pa, tipo)()) for nombre, tipo in ESQUEMAS[tabla]])
+
+
+def carpeta_instantanea(db_path: str = DB_PATH, version: tuple = None) -> Path:
+    """Carpeta de la instantánea de una versión de los datos (la actual si no se indica): <db>.arrow/<firma>/."""
+    version = version_datos(db_path) if version is None else version
+    firma = json.dumps([VERSION_INSTANTANEA, VERSION_MODELO, version])
+    base = Path(db_path).resolve()
+    return base.with_name(base.name + ".arrow") / hashlib.sha1(firma.encode()).hexdigest()[:16]
+
+
+def _exportar_tabla(conn, tabla: str, ruta: Path) -> int:
+    esquema = _esquema(tabla)
+    cursor = conn.execute(f"SELECT {', '.join(esquema.names)} FROM {tabla}")
+    filas_totales = 0
+    with pa.OSFile(str(ruta), "wb") as destino, pa.ipc.new_file(destino, esquema) as escritor:
+        while True:
+            filas = cursor.fetchmany(LOTE)
+            if not filas:
+                break
+            columnas = list(zip(*filas))
+            escritor.write_batch(pa.record_batch(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)], schema=esquema))
+            filas_totales += len(filas)
+    return filas_totales
+
+
+def _mtime(carpeta: Path) -> int:
+    try:
+        return carpeta.stat().st_mtime_ns
+    except FileNotFoundError:   # la borró otro proceso
+        return 0
+
+
+def _podar(destino: Path) -> None:
+    """Borra las instantáneas viejas; conserva la vigente y las CONSERVAR más recientes."""
+    viejas = [c for c in destino.parent.iterdir() if c != destino and ".tmp-" not in c.name]
+    viejas.sort(key=_mtime, reverse=True)
+    # Los procesos que aún tengan mapeada una carpeta borrada conservan sus páginas
+    for vieja in viejas[CONSERVAR:]:
+        shutil.rmtree(vieja, ignore_errors=True)
+
+
+def _fijar_estado(conn, db_path: str) -> tuple:
+    """Abre una transacción de lectura cuya firma se conoce; devuelve (versión, user_version).
+
+    La firma se toma antes y después de fijar el estado: si coincide, ninguna escritura cayó en
+    medio y la transacción ve exactamente esa versión. Devuelve (None, None) si la base no deja
+    de cambiar.
+    """
+    for _ in range(INTENTOS_FIRMA):
+        antes = version_datos(db_path)
+        conn.execute("BEGIN")
+        # La primera lectura fija el estado que verá toda la transacción
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version_datos(db_path) == antes:
+            return antes, user_version
+        conn.rollback()
+    return None, None
+
+
+def asegurar_instantanea(db_path: str = DB_PATH):
+    """Exporta la instantánea si la de la versión actual no existe; devuelve su carpeta.
+
+    Devuelve None si la base no tiene el modelo (`movimientos`, `cubo_diario`...) en la versión
+    actual o si no dejó de cambiar mientras se intentaba exportar.
+    Se escribe en una carpeta temporal que luego se renombra, así que ningún lector ve una
+    instantánea a medias; si dos procesos (o hilos) exportan a la vez, gana el primer renombre.
+    Todas las tablas se leen en una misma transacción, y la carpeta lleva la firma de ese estado.
+    """
+    destino = carpeta_instantanea(db_path)
+    if destino.exists():
+        return destino
+    conn = abrir_conexion(db_path)
+    try:
+        version, user_version = _fijar_estado(conn, db_path)
+        if version is None or user_version < VERSION_MODELO:
+            return None
+        destino = carpeta_instantanea(db_path, version)
+        if destino.exists():
+            return destino
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporal = destino.with_name(f"{destino.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(temporal, ignore_errors=True)
+        temporal.mkdir()
+        for tabla in ESQUEMAS:
+            _exportar_tabla(conn, tabla, temporal / f"{tabla}.arrow")
+    finally:
+        conn.close()
+    try:
+        temporal.rename(destino)
+    except OSError:   # otro proceso terminó primero
+        shutil.rmtree(temporal, ignore_errors=True)
+    _podar(destino)
+    return destino
+
+
+def _exportar_y_soltar(db_path: str, base: Path) -> None:
+    try:
+        if asegurar_instantanea(db_path) is None:
+            _registro.info("instantánea de %s sin exportar: falta el modelo o la base sigue cambiando", db_path)
+    except (sqlite3.Error, OSError) as e:   # p. ej. la base se reemplazó a mitad de la exportación
+        _registro.warning("no se pudo exportar la instantánea de %s: %s", db_path, e)
+    finally:
+        with _candado:
+            _exportando.pop(base, None)
+
+
+def exportar_en_segundo_plano(db_path: str = DB_PATH) -> None:
+    """Lanza la exportación de la versión actual en un hilo aparte, si no hay otra en curso.
+
+    Una sola exportación a la vez por base: durante una importación cada lote cambia la
+    versión, y la siguiente exportación la pide la primera lectura después de terminar esta.
+    """
+    destino = carpeta_instantanea(db_path)
+    with _candado:
+        if destino.exists() or destino.parent in _exportando:
+            return
+        hilo = threading.Thread(target=_exportar_y_soltar, args=(db_path, destino.parent),
+                                name="exportar-instantanea", daemon=True)
+        _exportando[destino.parent] = hilo
+    hilo.start()
+
+
+def carpeta_vigente(db_path: str = DB_PATH):
+    """Carpeta de la instantánea de la versión actual, o None si aún no está exportada.
+
+    Nunca exporta en el hilo que pregunta: si falta, la exportación arranca en segundo plano
+    y mientras tanto las lecturas van a SQLite. Una lectura toma la carpeta una sola vez y
+    saca de ella todas sus tablas, así que no mezcla versiones.
+    """
+    destino = carpeta_instantanea(db_path)
+    if destino.exists():
+        return destino
+    exportar_en_segundo_plano(db_path)
+    return None
+
+
+def tabla(carpeta: Path, nombre: str):
+    """Tabla Arrow mapeada en memoria (sin copiar) de la instantánea de `carpeta`."""
+    clave = (carpeta, nombre)
+    with _candado:
+        abierta = _abiertas.get(clave)
+        if abierta is None:
+            for vieja in [c for c in _abiertas if c[0].parent == carpeta.parent and c[0] != carpeta]:
+                del _abiertas[vieja]
+            abierta = pa.ipc.open_file(pa.memory_map(str(carpeta / f"{nombre}.arrow"))).read_all()
+            _abiertas[clave] = abierta
+        return abierta
+
+
+def olvidar(carpeta: Path) -> None:
+    """Descarta los mapas abiertos de `carpeta` (borrada o incompleta)."""
+    with _candado:
+        for clave in [c for c in _abiertas if c[0] == carpeta]:
+            del _abiertas[clave]
+
+
+def errores_lectura() -> tuple:
+    """Excepciones de una instantánea que desapareció o quedó a medias (se lee de SQLite)."""
+    return (OSError, pa.ArrowException) if pa is not None else (OSError,)
+
+# ==============================================================
+# LECTURAS (mismo resultado que las consultas SQL equivalentes)
+# ==============================================================
+
+def egresos_diarios(carpeta: Path) -> pd.DataFrame:
+    """Equivalente de CONSULTA_EGRESOS_DIARIOS."""
+    cubo = tabla(carpeta, "cubo_diario")
+    caja = cubo.filter(pc.and_(pc.equal(cubo["source"], "caja"), pc.not_equal(cubo["day"], "")))
+    agregado = caja.group_by(["detalle", "day"]).aggregate([("credit", "sum"), ("filas", "sum")])
+    agregado = agregado.rename_columns({"credit_sum": "credit", "filas_sum": "filas"})
+    agregado = agregado.sort_by([("detalle", "ascending"), ("day", "ascending")])
+    return agregado.select(["detalle", "day", "credit", "filas"]).to_pandas()
+
+
+def caja_mensual(carpeta: Path, year: int) -> pd.DataFrame:
+    """Equivalente de CONSULTA_CAJA_MENSUAL."""
+    cubo = tabla(carpeta, "cubo_diario")
+    caja = cubo.filter(pc.and_(pc.equal(cubo["source"], "caja"), pc.equal(cubo["year"], year)))
+    agregado = caja.group_by("month").aggregate([("debit", "sum"), ("credit", "sum")]).sort_by("month")
+    return pd.DataFrame({
+        "mes": pc.if_else(pc.equal(agregado["month"], ""), None, agregado["month"]).to_pandas(),
+        "total_ingresos": np.round(agregado["debit_sum"].to_numpy(), 2),
+        "total_egresos": np.round(agregado["credit_sum"].to_numpy(), 2),
+    })
+
+
+def cobros_cxc(carpeta: Path, year: int, year_socios: int) -> pd.DataFrame:
+    """Equivalente de CONSULTA_CXC: socios del año y socios con cobros, con sus cobros (o una fila sin cobro)."""
+    identidades = tabla(carpeta, "socios_identidad").select(["socio_id", "nombre"])
+    socios = tabla(carpeta, "socios")
+    movimientos = tabla(carpeta, "movimientos")
+    del_anio = socios.filter(pc.equal(socios["year"], year_socios))["socio_id"]
+    cobros = movimientos.filter(pc.and_(
+        pc.and_(pc.equal(movimientos["source"], "cxc"), pc.equal(movimientos["year"], year)),
+        pc.greater(movimientos["credit"], 0),
+    )).select(["socio_id", "fecha", "credit"])
+    unidos = identidades.join(cobros, keys="socio_id", join_type="left outer")
+    unidos = unidos.filter(pc.or_(pc.is_valid(unidos["credit"]), pc.is_in(unidos["socio_id"], value_set=del_anio)))
+    unidos = unidos.rename_columns({"credit": "ingreso"})
+    # Como ORDER BY en SQLite: los NULL (socios sin cobros) primero
+    return (unidos.select(["socio_id", "nombre", "fecha", "ingreso"]).to_pandas()
+            .sort_values(["socio_id", "fecha"], na_position="first", kind="stable", ignore_index=True))
+
+
+# Consultas del tablero que se pueden resolver sobre la instantánea (carpeta y los mismos parámetros)
+LECTURAS = {
+    CONSULTA_EGRESOS_DIARIOS: egresos_diarios,
+    CONSULTA_CAJA_MENSUAL: caja_mensual,
+    CONSULTA_CXC: cobros_cxc,
+}
+
+
+def lector(query: str):
+    """Función que resuelve `query` sobre la instantánea, o None si hay que ir a SQLite."""
+    return LECTURAS.get(query) if disponible() else None
+
+
+def leer(query: str, params: tuple = (), db_path: str = DB_PATH) -> pd.DataFrame:
+    """Resultado de `query`: desde la instantánea si tiene lectura columnar y ya está exportada,
+    si no (o si la carpeta desapareció a mitad de la lectura) desde SQLite."""
+    funcion = lector(query)
+    carpeta = carpeta_vigente(db_path) if funcion is not None else None
+    if carpeta is not None:
+        try:
+            return funcion(carpeta, *params)
+        except errores_lectura():
+            olvidar(carpeta)
+    return consultar(query, params, db_path)
+
+# ==============================================================
+# VERIFICACIÓN
+# ==============================================================
+
+def _igual(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    orden = list(a.columns)
+    a = a.sort_values(orden, na_position="first", ignore_index=True)
+    b = b.sort_values(orden, na_position="first", ignore_index=True)
+    for columna in orden:
+        x, y = a[columna].to_numpy(), b[columna].to_numpy()
+        if np.issubdtype(np.asarray(x).dtype, np.number) or np.issubdtype(np.asarray(y).dtype, np.number):
+            if not np.allclose(np.asarray(x, dtype=float), np.asarray(y, dtype=float), atol=0.011, equal_nan=True):
+                return False
+        elif not (pd.Series(x).fillna("\0").astype(str).to_numpy() == pd.Series(y).fillna("\0").astype(str).to_numpy()).all():
+            return False
+    return True
+
+
+def verificar(db_path: str = DB_PATH) -> list:
+    """Compara cada lectura columnar con su consulta SQL; devuelve las que difieren."""
+    carpeta = asegurar_instantanea(db_path)
+    if carpeta is None:
+        return [("asegurar_instantanea", "sin modelo actual")]
+    anios_caja = consultar("SELECT DISTINCT year FROM cubo_diario WHERE source = 'caja'", (), db_path)["year"]
+    casos = [(CONSULTA_EGRESOS_DIARIOS, ())]
+    casos += [(CONSULTA_CAJA_MENSUAL, (int(anio),)) for anio in anios_caja]
+    casos += [(CONSULTA_CXC, parametros_cxc(anio)) for anio in CXC_ANIOS]
+    return [
+        (LECTURAS[query].__name__, params) for query, params in casos
+        if not _igual(consultar(query, params, db_path), LECTURAS[query](carpeta, *params))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exporta la instantánea Arrow y la verifica contra SQLite.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    if pa is None:
+        raise SystemExit("La instantánea requiere pyarrow: pip install pyarrow")
+    carpeta = asegurar_instantanea(args.db)
+    if carpeta is None:
+        raise SystemExit(f"{args.db} no tiene el modelo actual: ejecuta python etl.py --db {args.db}")
+    tamano = sum(f.stat().st_size for f in carpeta.iterdir())
+    print(f"instantánea en {carpeta} ({tamano / 1024 / 1024:,.1f} MB)")
+    diferencias = verificar(args.db)
+    if diferencias:
+        print(f"instantánea inconsistente: {len(diferencias)} lecturas difieren")
+        for caso in diferencias:
+            print("  ", caso)
+        raise SystemExit(1)
+    print("instantánea consistente con SQLite")
+
+
+if __name__ == "__main__":
+    main()
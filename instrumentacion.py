@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación de consultas y gráficos por rerun
+Registra huella SQL, forma de los parámetros, tiempo, filas, bytes del DataFrame, acierto o fallo
+de caché y tiempo de construcción de figuras; captura EXPLAIN QUERY PLAN la primera vez que ve
+una huella y agrega cada evento a un archivo JSONL rotativo.
+Desactivada, cada punto de medición cuesta una lectura de ContextVar.
+"""
+
+import contextvars
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+from cache_consultas import normalizar_consulta
+from conexion import explicar
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# QQA_DIAGNOSTICO=1 deja el panel de diagnóstico activado al abrir el tablero.
+ACTIVA_POR_DEFECTO = os.environ.get("QQA_DIAGNOSTICO", "0") == "1"
+ARCHIVO_TRAZA = os.environ.get("QQA_TRAZA", "traza.jsonl")
+TRAZA_MAX_MB = int(os.environ.get("QQA_TRAZA_MB", "10"))
+TRAZA_RESPALDOS = 3
+
+_registro_actual = contextvars.ContextVar("registro_actual", default=None)
+_planes = {}                 # huella -> líneas de EXPLAIN QUERY PLAN, una vez por proceso
+_candado_planes = threading.Lock()
+_logger = None
+
+# ==============================================================
+# DESCRIPCIÓN DE CONSULTAS
+# ==============================================================
+
+def huella_consulta(query: str) -> str:
+    """Identificador corto y estable del texto SQL (sin importar espacios ni saltos de línea)."""
+    return hashlib.sha1(normalizar_consulta(query).encode("utf-8")).hexdigest()[:12]
+
+
+def forma_parametros(params: tuple) -> str:
+    """Tipos de los parámetros enlazados, sin sus valores: '(int, str)'."""
+    return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+
+
+def plan(huella: str) -> list:
+    """Plan capturado para `huella`, o una lista vacía si todavía no se vio."""
+    return _planes.get(huella, [])
+
+# ==============================================================
+# TRAZA JSONL
+# ==============================================================
+
+def _traza() -> logging.Logger:
+    """Logger del archivo de traza; se crea al registrar el primer evento."""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("qqa.traza")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            manejador = RotatingFileHandler(
+                ARCHIVO_TRAZA, maxBytes=TRAZA_MAX_MB * 1024 * 1024, backupCount=TRAZA_RESPALDOS, encoding="utf-8"
+            )
+            manejador.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(manejador)
+        _logger = logger
+    return _logger
+
+# ==============================================================
+# REGISTRO DE UN RERUN
+# ==============================================================
+
+class RegistroRerun:
+    """Eventos medidos durante un rerun del tablero."""
+
+    def __init__(self, seccion: str = ""):
+        self.rerun = dt.datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        self.seccion = seccion
+        self.eventos = []
+
+    def agregar(self, evento: dict) -> None:
+        evento = {"rerun": self.rerun, "seccion": self.seccion, **evento}
+        self.eventos.append(evento)
+        _traza().info(json.dumps(evento, ensure_ascii=False, default=str))
+
+    def tabla(self) -> pd.DataFrame:
+        columnas = ["tipo", "nombre", "huella", "parametros", "ms", "filas", "bytes", "cache", "error"]
+        return pd.DataFrame(self.eventos).reindex(columns=columnas)
+
+
+def iniciar(habilitada: bool, seccion: str = "") -> RegistroRerun:
+    """Abre el registro de este rerun (o desactiva la medición) y lo devuelve."""
+    registro = RegistroRerun(seccion) if habilitada else None
+    _registro_actual.set(registro)
+    return registro
+
+
+def activa() -> bool:
+    return _registro_actual.get() is not None
+
+# ==============================================================
+# PUNTOS DE MEDICIÓN
+# ==============================================================
+
+def _bytes(resultado) -> int:
+    if isinstance(resultado, pd.DataFrame):
+        return int(resultado.memory_usage(index=True, deep=True).sum())
+    return None
+
+
+def medir_consulta(query: str, params: tuple, db_path: str, obtener, cargar):
+    """Devuelve `obtener(cargar)` midiendo la consulta.
+
+    `obtener` resuelve el resultado (p. ej. desde la caché) y llama a `cargar` solo en un fallo;
+    si no la llama, el evento queda como acierto.
+    """
+    registro = _registro_actual.get()
+    if registro is None:
+        return obtener(cargar)
+
+    huella = huella_consulta(query)
+    evento = {"tipo": "consulta", "nombre": normalizar_consulta(query)[:60], "huella": huella,
+              "parametros": forma_parametros(params), "cache": "acierto"}
+
+    def cargar_medido():
+        evento["cache"] = "fallo"
+        inicio = time.perf_counter()
+        df = cargar()
+        evento["ms_sql"] = round((time.perf_counter() - inicio) * 1000, 3)
+        return df
+
+    inicio = time.perf_counter()
+    try:
+        df = obtener(cargar_medido)
+    except Exception as e:
+        evento["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        evento["ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+        if "error" not in evento:
+            evento["filas"] = len(df)
+            evento["bytes"] = _bytes(df)
+        with _candado_planes:
+            nueva = huella not in _planes
+            if nueva:
+                _planes[huella] = []
+        if nueva:
+            try:
+                _planes[huella] = explicar(query, params, db_path)
+            except Exception as e:
+                _planes[huella] = [f"sin plan: {e}"]
+            evento["plan"] = _planes[huella]
+        registro.agregar(evento)
+    return df
+
+
+def medir(tipo: str, nombre: str, funcion, *args, **kwargs):
+    """Mide `funcion(*args, **kwargs)`: construcción de figuras y cálculos en memoria."""
+    registro = _registro_actual.get()
+    if registro is None:
+        return funcion(*args, **kwargs)
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    evento = {"tipo": tipo, "nombre": nombre, "ms": round((time.perf_counter() - inicio) * 1000, 3)}
+    if isinstance(resultado, pd.DataFrame):
+        evento["filas"] = len(resultado)
+        evento["bytes"] = _bytes(resultado)
+    registro.agregar(evento)
+    return resultado
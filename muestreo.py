@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Reducción de datos antes de dibujar
+Submuestreo LTTB (Largest-Triangle-Three-Buckets) de series temporales a la resolución del
+gráfico, conservando picos, y agrupación de la cola larga de socios en una barra "Otros".
+"""
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================
+# CONFIGURACIÓN
+# ==============================================================
+
+# Puntos por píxel de ancho del gráfico: con más, los puntos ya no se distinguen en pantalla.
+PUNTOS_POR_PIXEL = 2
+# Puntos por serie cuando quien dibuja no indica el ancho del gráfico.
+PUNTOS_MAX_SERIE = 2000
+# Por encima de este número de puntos las trazas se dibujan con WebGL en lugar de SVG.
+UMBRAL_WEBGL = 1000
+# Barras visibles en "Todos los socios"; el resto se suma en una barra "Otros".
+MAX_BARRAS_SOCIOS = 25
+
+# ==============================================================
+# SERIES TEMPORALES
+# ==============================================================
+
+def puntos_para_ancho(ancho_px: int = None) -> int:
+    """Puntos que se conservan en una serie dibujada a `ancho_px` píxeles (PUNTOS_MAX_SERIE si no se sabe)."""
+    if not ancho_px:
+        return PUNTOS_MAX_SERIE
+    return max(3, int(ancho_px) * PUNTOS_POR_PIXEL)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, puntos: int) -> np.ndarray:
+    """Índices de los `puntos` elementos que LTTB conserva de la serie (x creciente).
+
+    Mantiene el primero y el último; de cada cubeta intermedia elige el punto que forma el
+    triángulo de mayor área con el punto elegido antes y el promedio de la cubeta siguiente,
+    de modo que los picos y valles sobreviven al submuestreo.
+    """
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Límites de las cubetas intermedias sobre los puntos 1..n-2
+    bordes = np.floor(np.arange(puntos - 1) * (n - 2) / (puntos - 2)).astype(np.int64) + 1
+    bordes[-1] = n - 1
+    # Promedios de cada cubeta con sumas acumuladas; la última "cubeta siguiente" es el punto final
+    acum_x = np.concatenate(([0.0], np.cumsum(x)))
+    acum_y = np.concatenate(([0.0], np.cumsum(y)))
+    tamanos = np.diff(bordes)
+    prom_x = np.append((acum_x[bordes[1:]] - acum_x[bordes[:-1]]) / tamanos, x[-1])
+    prom_y = np.append((acum_y[bordes[1:]] - acum_y[bordes[:-1]]) / tamanos, y[-1])
+
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - prom_x[i + 1]) * (y[inicio:fin] - ya) - (xa - x[inicio:fin]) * (prom_y[i + 1] - ya))
+        a = inicio + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def reducir_serie(df: pd.DataFrame, x: str, y: str, puntos: int = PUNTOS_MAX_SERIE) -> pd.DataFrame:
+    """`df` con a lo sumo `puntos` filas elegidas por LTTB; sin cambios si ya cabe."""
+    if len(df) <= puntos:
+        return df
+    eje = df[x].to_numpy()
+    if np.issubdtype(eje.dtype, np.datetime64):
+        eje = eje.astype("datetime64[ns]").astype(np.int64)
+    return df.iloc[lttb(eje, df[y].to_numpy(), puntos)]
+
+# ==============================================================
+# COLA LARGA DE CATEGORÍAS
+# ==============================================================
+
+def agrupar_cola(df: pd.DataFrame, etiqueta: str, valor: str, max_barras: int = MAX_BARRAS_SOCIOS) -> pd.DataFrame:
+    """Las `max_barras - 1` filas de mayor `valor` más una fila "Otros (n)" con la suma del resto.
+
+    `df` debe venir ordenado de mayor a menor; si cabe completo se devuelve igual.
+    """
+    if max_barras is None or len(df) <= max_barras:
+        return df
+    cabeza, cola = df.iloc[:max_barras - 1], df.iloc[max_barras - 1:]
+    otros = pd.DataFrame({etiqueta: [f"Otros ({len(cola)})"], valor: [round(float(cola[valor].sum()), 2)]})
+    return pd.concat([cabeza[[etiqueta, valor]], otros], ignore_index=True)
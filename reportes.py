@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de reportes por lotes (sin Streamlit)
+Calcula todas las secciones del tablero para todos los años y socios en un pool de procesos
+y escribe tablas (CSV/Parquet) y gráficos (HTML estático). Omite las secciones cuyos datos
+no cambiaron desde la última corrida.
+Uso: python reportes.py [--db contabilidad.db] [--salida reportes] [--formato csv] [--procesos 4]
+"""
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import multiprocessing
+import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from caja import CONSULTA_ANIOS_CAJA, CONSULTA_CAJA_MENSUAL
+from conexion import DB_PATH
+from cxc import CONSULTA_CXC, CXC_ANIOS, hay_cobros, lista_socios, parametros_cxc, serie_socio, totales_por_socio
+from egresos import CONSULTA_EGRESOS_DIARIOS, IndiceEgresos
+from etl import VERSION_MODELO, asegurar_modelo
+from instantanea import asegurar_instantanea, disponible, leer
+
+# Se incrementa cuando cambia el contenido o el formato de los reportes, para regenerarlos todos.
+VERSION_REPORTES = 6
+
+MANIFIESTO = "manifiesto.json"
+
+# Ancho supuesto (px) de los gráficos de series en el HTML: fija los puntos que se dibujan;
+# la figura se ajusta al ancho de la ventana.
+ANCHO_FIGURA_PX = 1200
+
+# ==============================================================
+# HUELLAS DE LOS DATOS DE ENTRADA
+# ==============================================================
+
+_RESUMEN_MOVIMIENTOS = """
+    SELECT COUNT(*), TOTAL(debit), TOTAL(credit), TOTAL(saldo), MIN(fecha), MAX(fecha),
+           TOTAL(socio_id), TOTAL(length(detalle))
+    FROM movimientos
+    WHERE source = ? AND year = ?
+"""
+_RESUMEN_SOCIOS = """
+    SELECT COUNT(*), group_concat(s.socio_id || ':' || d.nombre, '|')
+    FROM socios s
+    JOIN socios_identidad d ON d.socio_id = s.socio_id
+    WHERE s.year = ?
+"""
+# El top de egresos de un año toma las filas de caja con fecha en ese año, vengan de la tabla que vengan
+_RESUMEN_EGRESOS = """
+    SELECT COUNT(*), TOTAL(credit), TOTAL(length(detalle))
+    FROM movimientos
+    WHERE source = 'caja' AND fecha BETWEEN ? AND ?
+"""
+
+
+def huella(conn: sqlite3.Connection, seccion: str, anio: int) -> str:
+    """Resumen de los datos que usa una sección; si no cambia, el reporte tampoco."""
+    if seccion == "cxc":
+        entradas = [
+            conn.execute(_RESUMEN_MOVIMIENTOS, ("cxc", anio)).fetchone(),
+            conn.execute(_RESUMEN_SOCIOS, (CXC_ANIOS[anio]["socios"],)).fetchone(),
+        ]
+    elif seccion == "top_egresos":
+        entradas = [conn.execute(_RESUMEN_EGRESOS, (f"{anio}-01-01", f"{anio}-12-31")).fetchone()]
+    else:
+        entradas = [conn.execute(_RESUMEN_MOVIMIENTOS, ("caja", anio)).fetchone()]
+    texto = json.dumps([VERSION_REPORTES, VERSION_MODELO, seccion, anio, entradas], default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def planificar(db_path: str) -> list:
+    """Lista de (seccion, anio) a generar: caja y top egresos por año de caja, CXC por año configurado."""
+    anios_caja = leer(CONSULTA_ANIOS_CAJA, (), db_path)["year"].tolist()
+    tareas = [(seccion, int(anio)) for anio in anios_caja for seccion in ("caja_mensual", "top_egresos")]
+    tareas += [("cxc", anio) for anio in CXC_ANIOS]
+    return tareas
+
+# ==============================================================
+# ESCRITURA
+# ==============================================================
+
+def _slug(texto: str) -> str:
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return re.sub(r"[^0-9a-zA-Z]+", "_", sin_tildes).strip("_").lower() or "sin_nombre"
+
+
+def _archivo_socio(socio_id: int, nombre: str) -> str:
+    """Nombre de archivo de un socio: el socio_id lo hace único aunque dos nombres den el mismo slug."""
+    return f"{socio_id}_{_slug(nombre)}"
+
+
+def _escribir_tabla(df: pd.DataFrame, ruta: Path, formato: str) -> list:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    archivos = []
+    if formato in ("csv", "ambos"):
+        df.to_csv(ruta.with_suffix(".csv"), index=False)
+        archivos.append(ruta.with_suffix(".csv"))
+    if formato in ("parquet", "ambos"):
+        df.to_parquet(ruta.with_suffix(".parquet"), index=False)
+        archivos.append(ruta.with_suffix(".parquet"))
+    return archivos
+
+
+def _escribir_figura(fig, ruta: Path) -> Path:
+    ruta = ruta.with_suffix(".html")
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fig.write_html(ruta, include_plotlyjs="cdn", full_html=True)
+    return ruta
+
+# ==============================================================
+# SECCIONES (se ejecutan en los procesos del pool)
+# ==============================================================
+
+def tops_egresos(db_path: str, anios: list) -> dict:
+    """Top 10 egresos de cada año con un solo índice de sumas acumuladas: {anio: DataFrame}."""
+    indice = IndiceEgresos(leer(CONSULTA_EGRESOS_DIARIOS, (), db_path))
+    return {anio: indice.top(dt.date(anio, 1, 1), dt.date(anio, 12, 31), 10) for anio in anios}
+
+
+def generar_seccion(db_path: str, salida: str, formato: str, seccion: str, anio: int,
+                    df_top10: pd.DataFrame = None) -> list:
+    """Genera los archivos de una sección y un año; devuelve las rutas escritas.
+
+    Para top_egresos, `df_top10` es el top ya calculado en la corrida (ver `tops_egresos`).
+    """
+    # Importación diferida: plotly solo se carga en los procesos que dibujan
+    from graficos import fig_caja_mensual, fig_serie_socio, fig_top_egresos, fig_totales_socios
+
+    carpeta = Path(salida) / str(anio)
+    archivos = []
+
+    if seccion == "caja_mensual":
+        df_caja = leer(CONSULTA_CAJA_MENSUAL, (anio,), db_path)
+        archivos += _escribir_tabla(df_caja, carpeta / "caja_mensual", formato)
+        if not df_caja.empty:
+            archivos.append(_escribir_figura(fig_caja_mensual(df_caja, anio), carpeta / "caja_mensual"))
+
+    elif seccion == "top_egresos":
+        if df_top10 is None:
+            df_top10 = tops_egresos(db_path, [anio])[anio]
+        archivos += _escribir_tabla(df_top10, carpeta / "top10_egresos", formato)
+        if not df_top10.empty:
+            titulo = f"Top 10 conceptos con mayores egresos — {anio}"
+            archivos.append(_escribir_figura(fig_top_egresos(df_top10, titulo), carpeta / "top10_egresos"))
+
+    elif seccion == "cxc":
+        df_cxc = leer(CONSULTA_CXC, parametros_cxc(anio), db_path)
+        if not df_cxc.empty and hay_cobros(df_cxc):
+            df_all = totales_por_socio(df_cxc)
+            archivos += _escribir_tabla(df_all, carpeta / "cxc_totales", formato)
+            archivos.append(_escribir_figura(fig_totales_socios(df_all, anio), carpeta / "cxc_totales"))
+            for socio_id, nombre in lista_socios(df_cxc).items():
+                df_socio = serie_socio(df_cxc, socio_id)
+                if df_socio.empty:
+                    continue
+                ruta = carpeta / "cxc_socios" / _archivo_socio(socio_id, nombre)
+                archivos += _escribir_tabla(df_socio, ruta, formato)
+                archivos.append(_escribir_figura(fig_serie_socio(df_socio, nombre, anio, ANCHO_FIGURA_PX), ruta))
+
+    return [str(a) for a in archivos]
+
+# ==============================================================
+# ORQUESTACIÓN
+# ==============================================================
+
+def generar_reportes(db_path: str, salida: str, formato: str = "csv", procesos: int = None,
+                     forzar: bool = False) -> dict:
+    """Genera los reportes que cambiaron. Devuelve {'generadas': [...], 'omitidas': [...]}."""
+    if formato in ("parquet", "ambos"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("El formato parquet requiere pyarrow: pip install pyarrow")
+
+    asegurar_modelo(db_path)
+    if disponible():
+        # Se exporta una vez aquí; los procesos del pool mapean los mismos archivos
+        asegurar_instantanea(db_path)
+    Path(salida).mkdir(parents=True, exist_ok=True)
+    ruta_manifiesto = Path(salida) / MANIFIESTO
+    manifiesto = json.loads(ruta_manifiesto.read_text()) if ruta_manifiesto.exists() else {}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        huellas = {f"{s}/{a}": huella(conn, s, a) for s, a in planificar(db_path)}
+    finally:
+        conn.close()
+
+    pendientes = [
+        clave for clave, h in huellas.items()
+        if forzar or manifiesto.get(clave, {}).get("huella") != h or manifiesto[clave].get("formato") != formato
+    ]
+    omitidas = [clave for clave in huellas if clave not in pendientes]
+
+    # El índice de egresos se construye una sola vez y cada tarea recibe su top 10
+    anios_top = [int(clave.split("/")[1]) for clave in pendientes if clave.startswith("top_egresos/")]
+    tops = tops_egresos(db_path, anios_top) if anios_top else {}
+
+    # spawn: cada proceso abre su propia conexión de solo lectura en lugar de heredar la del padre
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        futuros = {}
+        for clave in pendientes:
+            seccion, anio = clave.split("/")
+            futuros[pool.submit(generar_seccion, db_path, salida, formato, seccion, int(anio),
+                                tops.get(int(anio)) if seccion == "top_egresos" else None)] = clave
+        for futuro in as_completed(futuros):
+            clave = futuros[futuro]
+            archivos = futuro.result()
+            # Archivos de la corrida anterior que ya no se generan (p. ej. un socio retirado)
+            for viejo in set(manifiesto.get(clave, {}).get("archivos", [])) - set(archivos):
+                Path(viejo).unlink(missing_ok=True)
+            manifiesto[clave] = {"huella": huellas[clave], "formato": formato, "archivos": archivos}
+            # Se guarda tras cada sección: si la corrida se interrumpe, lo ya hecho no se repite
+            ruta_manifiesto.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False))
+
+    return {"generadas": pendientes, "omitidas": omitidas}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera los reportes del tablero sin Streamlit.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--salida", default="reportes")
+    parser.add_argument("--formato", choices=("csv", "parquet", "ambos"), default="csv")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--forzar", action="store_true", help="Regenera todo aunque los datos no hayan cambiado")
+    args = parser.parse_args()
+
+    resultado = generar_reportes(args.db, args.salida, args.formato, args.procesos, args.forzar)
+    print(f"secciones generadas: {len(resultado['generadas'])}, sin cambios: {len(resultado['omitidas'])}")
+    for clave in sorted(resultado["generadas"]):
+        print(f"  {clave}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Sección Caja mensual del tablero
+"""
+
+import streamlit as st
+
+import instrumentacion
+from caja import CONSULTA_ANIOS_CAJA, CONSULTA_CAJA_MENSUAL
+from tablero import ejecutar_consulta, seccion
+
+
+@seccion("caja_mensual")
+def mostrar() -> None:
+    st.subheader("📦 Caja mensual (básico)")
+    st.write("""
+    Cada barra suma los recibos de caja (ingresos) y las facturas o comprobantes de egreso (egresos) de un mes; 
+    el selector cambia el año consultado, de 2020 a 2025. 
+    En 2025 los egresos superan a los ingresos de enero a mayo, con picos en febrero y enero, 
+    y desde junio casi no hay movimientos: solo pequeños ingresos en septiembre y noviembre. 
+    En 2024 los ingresos llegan concentrados en agosto y diciembre, mientras que los egresos se reparten a lo largo del año. 
+    Los meses con egresos altos y sin ingresos muestran que la caja depende de pocos aportes grandes, 
+    lo que hace recomendable planear los pagos alrededor de esas entradas.
+    """)
+    df_anios = ejecutar_consulta(CONSULTA_ANIOS_CAJA)
+    anios_caja = df_anios['year'].tolist() if not df_anios.empty else [2025]
+    anio_caja = st.selectbox("Año:", anios_caja)
+
+    with st.expander("📊 Mostrar gráficos de caja mensual"):
+        df_caja = ejecutar_consulta(CONSULTA_CAJA_MENSUAL, (anio_caja,))
+
+        if df_caja.empty:
+            st.warning(f"No se encontraron datos de caja para {anio_caja}.")
+        else:
+            st.dataframe(df_caja, use_container_width=True)
+
+            from graficos import fig_caja_mensual   # plotly se carga al dibujar el primer gráfico
+            fig = instrumentacion.medir("figura", "caja_mensual", fig_caja_mensual, df_caja, anio_caja)
+            st.plotly_chart(fig, use_container_width=True)
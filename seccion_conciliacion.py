@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Sección Conciliación de saldos del tablero
+"""
+
+import streamlit as st
+
+import instrumentacion
+from conciliacion import consulta_grupo, detalle_grupo, resumen
+from conexion import DB_PATH
+from tablero import ANCHO_GRAFICO_PX, ejecutar_consulta, seccion
+
+
+def _etiqueta(fila) -> str:
+    socio = f" · socio {fila['socio']}" if fila["socio"] else ""
+    return f"{fila['tabla']}{socio} ({fila['filas_divergentes']:,} filas no cuadran)"
+
+
+@seccion("conciliacion")
+def mostrar() -> None:
+    st.subheader("🧮 Conciliación de saldos")
+    st.write("""
+    Cada tabla de caja, cuentas por cobrar, cuentas por pagar y estado de resultados guarda un saldo junto a sus movimientos.
+    Aquí ese saldo se recalcula desde el saldo de apertura (el cierre del año anterior, cuando existe) sumando entradas y restando salidas,
+    fila por fila y, en las cuentas, socio por socio. Para cada tabla se señala la primera fila donde el saldo registrado deja de coincidir,
+    que es el punto por donde conviene empezar a revisar el libro.
+    """)
+
+    # Se recalcula solo cuando cambian los datos; entre reruns y sesiones se reutiliza
+    df = instrumentacion.medir("memoria", "conciliacion", resumen, DB_PATH)
+    if df.empty:
+        st.warning("No se encontraron tablas con saldo corrido en la base de datos.")
+        return
+
+    descuadres = df[df["estado"] == "descuadre"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Tablas / socios revisados", f"{len(df):,}")
+    col2.metric("Cuadran", f"{(df['estado'] == 'cuadra').sum():,}")
+    col3.metric("Con descuadre", f"{len(descuadres):,}")
+
+    solo_descuadres = st.checkbox("Mostrar solo los que no cuadran", value=True)
+    st.dataframe(descuadres if solo_descuadres else df, use_container_width=True, hide_index=True)
+
+    if descuadres.empty:
+        st.success("Todos los saldos registrados coinciden con sus movimientos.")
+        return
+
+    opciones = {_etiqueta(fila): fila for _, fila in descuadres.iterrows()}
+    elegido = st.selectbox("Revisar fila por fila:", list(opciones))
+    with st.expander("📊 Saldo registrado contra saldo calculado"):
+        fila = opciones[elegido]
+        df_grupo = ejecutar_consulta(*consulta_grupo(fila))
+        df_detalle = instrumentacion.medir("memoria", "detalle_conciliacion", detalle_grupo, df_grupo, fila["apertura"])
+        st.caption(f"Apertura {fila['apertura']:,.0f} ({fila['origen_apertura']}); "
+                   f"primera fila que no cuadra: {fila['primera_fila']}")
+        st.dataframe(df_detalle, use_container_width=True, hide_index=True)
+
+        from graficos import fig_conciliacion   # plotly se carga al dibujar el primer gráfico
+        fig = instrumentacion.medir("figura", "conciliacion", fig_conciliacion, df_detalle, elegido, ANCHO_GRAFICO_PX)
+        st.plotly_chart(fig, use_container_width=True)
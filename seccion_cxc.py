@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Sección Ingresos por socio (CXC) del tablero, una por año de CXC_ANIOS
+"""
+
+import streamlit as st
+
+import instrumentacion
+from cxc import CONSULTA_CXC, CXC_ANIOS, hay_cobros, lista_socios, parametros_cxc, serie_socio, totales_por_socio
+from muestreo import MAX_BARRAS_SOCIOS
+from tablero import ANCHO_GRAFICO_PX, ejecutar_consulta, seccion
+
+
+@seccion("cxc")
+def mostrar(anio: int) -> None:
+    config = CXC_ANIOS[anio]
+    st.subheader(f"💰 Ingresos por socio (CXC) — Año {anio}")
+    st.write(config["descripcion"])
+
+    # Un solo viaje a la base por año: cambiar de socio solo filtra el DataFrame en memoria
+    df_cxc = ejecutar_consulta(CONSULTA_CXC, parametros_cxc(anio))
+
+    if df_cxc.empty or not hay_cobros(df_cxc):
+        st.warning(f"⚠️ No se encontraron cuentas por cobrar para {anio} en la base de datos. No hay registros de ingresos disponibles.")
+    else:
+        # Las opciones son socio_id (None: todos); el nombre es solo la etiqueta
+        socios = lista_socios(df_cxc)
+        socio_id = st.selectbox(f"Selecciona un socio ({anio}):", [None, *socios],
+                                format_func=lambda i: "Todos los socios" if i is None else socios[i])
+
+        with st.expander(f"📈 Mostrar resultados CXC {anio}"):
+            if socio_id is None:
+                df_all = instrumentacion.medir("memoria", "totales_por_socio", totales_por_socio, df_cxc)
+                st.dataframe(df_all, use_container_width=True)
+                # La cola de socios pequeños va en "Otros" salvo que se pida verla completa
+                max_barras = MAX_BARRAS_SOCIOS
+                if len(df_all) > MAX_BARRAS_SOCIOS and st.toggle(f"Mostrar los {len(df_all)} socios", key=f"todos_socios_{anio}"):
+                    max_barras = None
+                from graficos import fig_totales_socios
+                fig = instrumentacion.medir("figura", "totales_socios", fig_totales_socios, df_all, anio, max_barras)
+                st.plotly_chart(fig, use_container_width=True)
+
+            else:
+                socio_sel = socios[socio_id]
+                df_socio = instrumentacion.medir("memoria", "serie_socio", serie_socio, df_cxc, socio_id)
+
+                if df_socio.empty:
+                    st.warning(f"No se encontraron ingresos registrados para {socio_sel} en {anio}.")
+                else:
+                    st.dataframe(df_socio, use_container_width=True)
+                    from graficos import fig_serie_socio
+                    fig = instrumentacion.medir("figura", "serie_socio", fig_serie_socio, df_socio, socio_sel, anio, ANCHO_GRAFICO_PX)
+                    st.plotly_chart(fig, use_container_width=True)
+
+    st.write(config["nota"])
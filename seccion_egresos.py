@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Sección Top 10 egresos del tablero
+"""
+
+import pandas as pd
+import streamlit as st
+
+import instrumentacion
+from cache_consultas import version_datos
+from conexion import DB_PATH
+from tablero import indice_egresos, seccion
+
+
+@seccion("top_egresos")
+def mostrar() -> None:
+    st.subheader("💸 Top 10 egresos más altos")
+    st.write("""
+    Lista los diez egresos de caja más altos entre las dos fechas elegidas; el rango puede abarcar cualquier periodo entre 2020 y 2025. 
+    En 2025 dominan las compras de insumos (facturas de plásticos y agrícolas) y trámites como la renovación en la cámara de comercio. 
+    En 2023 y 2024 los mayores egresos son pagos de intereses y abonos a deudas con socias, 
+    lo que indica que buena parte de la caja se destina a atender cuentas por pagar y no a la operación.
+    """)
+    col1, col2 = st.columns(2)
+    with col1:
+        fecha_inicio = st.date_input("Fecha inicial", pd.to_datetime("2025-01-01"))
+    with col2:
+        fecha_fin = st.date_input("Fecha final", pd.to_datetime("2025-12-31"))
+
+    with st.expander("📊 Mostrar datos de egresos"):
+        # Índice de sumas acumuladas de todos los años de caja: cualquier rango sin ir a la base
+        indice = indice_egresos(version_datos(DB_PATH))
+        df_top10 = instrumentacion.medir("memoria", "top_egresos", indice.top, fecha_inicio, fecha_fin, 10)
+
+        if df_top10.empty:
+            st.warning("No se encontraron egresos en el rango seleccionado.")
+        else:
+            st.dataframe(df_top10, use_container_width=True)
+
+            from graficos import fig_top_egresos
+            fig = instrumentacion.medir("figura", "top_egresos", fig_top_egresos, df_top10)
+            st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Servicios compartidos por las secciones del tablero
+Consulta con caché e instrumentación, índice de egresos y el decorador que convierte cada
+sección en un fragmento de Streamlit (sus widgets solo vuelven a ejecutar la sección).
+"""
+
+import functools
+import os
+
+import pandas as pd
+import streamlit as st
+
+import instrumentacion
+from cache_consultas import cache, version_datos
+from conexion import DB_PATH
+from coordinador import leer_coordinado
+from egresos import CONSULTA_EGRESOS_DIARIOS, IndiceEgresos
+from etl import asegurar_modelo
+from instantanea import disponible, exportar_en_segundo_plano
+
+# ==============================================================
+# DATOS
+# ==============================================================
+
+@st.cache_resource(max_entries=1)
+def _preparar_modelo(version: tuple) -> None:
+    """Construye o migra el modelo (`movimientos`, `socios`) una vez por versión de la base.
+
+    La instantánea Arrow se exporta en segundo plano; hasta que esté lista las lecturas van a SQLite.
+    """
+    asegurar_modelo(DB_PATH)
+    if disponible():
+        exportar_en_segundo_plano(DB_PATH)
+
+
+def preparar_modelo() -> None:
+    """Se llama en cada rerun; el trabajo solo se repite si la base cambió o se reemplazó.
+
+    La versión incluye el inodo y la fecha del archivo, así que una base copiada encima (sin
+    `movimientos`) o un cambio de `user_version` vuelven a pasar por `asegurar_modelo`.
+    """
+    _preparar_modelo(version_datos(DB_PATH))
+
+
+def ejecutar_consulta(query: str, params: tuple = ()) -> pd.DataFrame:
+    """Ejecuta una consulta SQL parametrizada (con caché LRU por versión de datos) y devuelve un DataFrame.
+
+    En un fallo de caché, la consulta pasa por el coordinador del proceso: si otra sesión ya la
+    está ejecutando se espera ese resultado, y las de agregación se resuelven sobre la
+    instantánea Arrow.
+    """
+    try:
+        return instrumentacion.medir_consulta(
+            query, params, DB_PATH,
+            lambda cargar: cache.obtener(query, params, DB_PATH, cargar),
+            lambda: leer_coordinado(query, params, DB_PATH),
+        )
+    except Exception as e:
+        st.error(f"Error ejecutando consulta: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_resource(max_entries=1)
+def indice_egresos(version: tuple) -> IndiceEgresos:
+    """Índice de Top 10 egresos; se reconstruye solo cuando cambia la versión de los datos."""
+    df_diario = ejecutar_consulta(CONSULTA_EGRESOS_DIARIOS)
+    if df_diario.empty:
+        df_diario = pd.DataFrame(columns=["detalle", "day", "credit", "filas"])
+    return IndiceEgresos(df_diario)
+
+# ==============================================================
+# SECCIONES COMO FRAGMENTOS
+# ==============================================================
+
+CLAVE_DIAGNOSTICO = "diagnostico"
+
+# Presupuesto de puntos de los gráficos de series, expresado como el ancho en píxeles que se
+# supone para la columna principal (layout "wide" en una pantalla de 1366 px, menos el menú
+# lateral). Los gráficos siguen ocupando el ancho del contenedor, que el servidor no conoce;
+# este valor solo decide cuántos puntos se envían. Se cambia con QQA_ANCHO_GRAFICO.
+ANCHO_GRAFICO_PX = int(os.environ.get("QQA_ANCHO_GRAFICO", "1000"))
+
+
+def seccion(nombre: str):
+    """Decorador: la sección corre como `st.fragment` y mide sus consultas y gráficos.
+
+    Un cambio en un widget de la sección vuelve a ejecutar solo la función decorada. Como
+    un fragmento no puede escribir en el menú lateral, el panel de diagnóstico se dibuja al
+    final de la propia sección.
+    """
+    def decorador(funcion):
+        @st.fragment
+        @functools.wraps(funcion)
+        def fragmento(*args, **kwargs):
+            registro = instrumentacion.iniciar(st.session_state.get(CLAVE_DIAGNOSTICO, False), nombre)
+            funcion(*args, **kwargs)
+            if registro is not None:
+                mostrar_diagnostico(registro)
+        return fragmento
+    return decorador
+
+
+def mostrar_diagnostico(registro: instrumentacion.RegistroRerun) -> None:
+    with st.expander("🩺 Diagnóstico de este rerun", expanded=True):
+        tabla = registro.tabla()
+        st.dataframe(tabla, use_container_width=True, hide_index=True)
+        st.caption(f"Total medido: {tabla['ms'].sum():,.1f} ms · traza en `{instrumentacion.ARCHIVO_TRAZA}`")
+        for huella in tabla.loc[tabla["tipo"] == "consulta", "huella"].unique():
+            st.code("\n".join(instrumentacion.plan(huella)) or "(sin plan)", language=None)